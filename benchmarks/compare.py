@@ -0,0 +1,69 @@
+"""Compare two benchmark reports and flag regressions.
+
+    python -m benchmarks.compare base.json head.json --threshold 0.10
+
+Exits with status 1 when any tracked metric got worse by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+# Metrics where a bigger number is an improvement; everything else is a duration
+HIGHER_IS_BETTER = {"upload.chunks_per_second"}
+
+
+def flatten(report: dict) -> dict:
+    metrics = {}
+    upload = report.get("upload", {})
+    for key in ("mean_ms", "p50_ms", "p90_ms", "p99_ms", "chunks_per_second"):
+        if upload.get(key) is not None:
+            metrics[f"upload.{key}"] = upload[key]
+    for run in report.get("finalize", []):
+        prefix = f"finalize.{run['minutes']:g}min"
+        metrics[f"{prefix}.wall_seconds"] = run["wall_seconds"]
+        metrics[f"{prefix}.with_summary_seconds"] = run["with_summary_seconds"]
+        for stage, seconds in run.get("stages", {}).items():
+            metrics[f"{prefix}.{stage}"] = seconds
+    return metrics
+
+
+def compare(base: dict, head: dict, threshold: float):
+    rows = []
+    regressions = []
+    base_metrics, head_metrics = flatten(base), flatten(head)
+    for name in sorted(set(base_metrics) | set(head_metrics)):
+        before, after = base_metrics.get(name), head_metrics.get(name)
+        if before is None or after is None or before == 0:
+            rows.append((name, before, after, None))
+            continue
+        change = (after - before) / before
+        rows.append((name, before, after, change))
+        worse = -change if name in HIGHER_IS_BETTER else change
+        if worse > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+
+    rows, regressions = compare(base, head, args.threshold)
+    print(f"base {base['meta']['revision'][:10]}  head {head['meta']['revision'][:10]}")
+    for name, before, after, change in rows:
+        flag = "  REGRESSION" if name in regressions else ""
+        change_text = f"{change:+.1%}" if change is not None else "n/a"
+        print(f"{name:70s} {before if before is not None else '-':>12} {after if after is not None else '-':>12} {change_text:>8}{flag}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
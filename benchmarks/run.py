@@ -0,0 +1,280 @@
+"""Offline end-to-end benchmark for chunk upload latency and finalize throughput.
+
+Runs the real FastAPI app in-process against a local S3 stand-in and an in-memory (or
+local) MongoDB, feeding it synthetic multi-speaker meeting audio, and writes a JSON report
+that `benchmarks/compare.py` can diff between commits.
+
+    python -m benchmarks.run --models stub --sessions 8 --meeting-minutes 10,30,60
+    python -m benchmarks.run --models tiny --output bench_tiny.json   # needs LLM_MODEL_PATH
+
+Model modes:
+    stub  every model library is replaced by benchmarks.stub_models; --asr-rtf and
+          --llm-tokens-per-second simulate model cost
+    tiny  real libraries with every ASR profile on Whisper tiny; LLM_MODEL_PATH should
+          point at a small GGUF model
+    real  whatever the environment configures (production models)
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from benchmarks import synthetic_audio
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", choices=["stub", "tiny", "real"], default="stub")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions uploading chunks")
+    parser.add_argument("--chunks-per-session", type=int, default=6)
+    parser.add_argument("--chunk-seconds", type=float, default=10.0)
+    parser.add_argument("--chunk-interval", type=float, default=0.0,
+                        help="seconds between a session's uploads; 0 sends back to back")
+    parser.add_argument("--meeting-minutes", default="10,30,60",
+                        help="comma separated meeting lengths to finalize; empty to skip")
+    parser.add_argument("--speakers", type=int, default=2)
+    parser.add_argument("--asr-rtf", type=float, default=0.0, help="stub ASR seconds per audio second")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=0.0, help="stub LLM speed; 0 is instant")
+    parser.add_argument("--storage-codec", choices=["wav", "opus", "flac"], default="wav",
+                        help="AUDIO_STORAGE_CODEC for chunks and merged recordings (opus/flac need ffmpeg)")
+    parser.add_argument("--upload-mode", choices=["multipart", "presigned"], default="multipart",
+                        help="send chunks through the API, or PUT them to S3 and call the ingest endpoint")
+    parser.add_argument("--mongo-uri", default=None, help="use a real local MongoDB instead of mongomock")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_output.json")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args):
+    os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("MONGO_DB_NAME", "sales_ai_benchmark")
+    os.environ.setdefault("AWS_BUCKET_NAME", "benchmark")
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY", "benchmark")
+    os.environ.setdefault("AWS_SECRET_KEY", "benchmark")
+    os.environ["AUDIO_STORAGE_CODEC"] = args.storage_codec
+    if args.models == "tiny":
+        os.environ.setdefault("ASR_PROFILE_OVERRIDES", json.dumps({
+            "fast": {"model": "tiny"},
+            "balanced": {"model": "tiny"},
+            "accurate": {"engine": "openai-whisper", "model": "tiny"},
+        }))
+    elif args.models == "stub":
+        from benchmarks import stub_models
+        stub_models.install(asr_rtf=args.asr_rtf, llm_tokens_per_second=args.llm_tokens_per_second)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return "unknown"
+
+
+def summarize_latencies(latencies: list) -> dict:
+    if not latencies:
+        return {"count": 0}
+    ms = np.array(latencies) * 1000
+    return {
+        "count": len(latencies),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def metric_sums() -> dict:
+    from src.services.metrics import MONGO_REQUEST_SECONDS, PIPELINE_STAGE_SECONDS, S3_BYTES, S3_REQUEST_SECONDS
+    values = {}
+    for metric in (PIPELINE_STAGE_SECONDS, S3_REQUEST_SECONDS, MONGO_REQUEST_SECONDS, S3_BYTES):
+        for family in metric.collect():
+            for sample in family.samples:
+                if sample.name.endswith(("_sum", "_total")):
+                    label = next(iter(sample.labels.values()))
+                    values[f"{family.name}:{label}"] = sample.value
+    return values
+
+
+def metric_deltas(before: dict, after: dict) -> dict:
+    deltas = {key: value - before.get(key, 0.0) for key, value in after.items()}
+    return {key: round(value, 6) for key, value in sorted(deltas.items()) if value > 0}
+
+
+async def wait_for_background_tasks(timeout: float = 600.0):
+    from src.services.task_supervisor import supervisor
+    await supervisor.wait_idle(timeout)
+
+
+async def create_session(client, headers, title: str) -> str:
+    response = await client.post("/api/meetings", headers=headers, json={
+        "title": title,
+        "description": "Synthetic benchmark meeting",
+        "topics": ["pricing", "timeline"],
+        "participants": 2,
+        "product_details": "Benchmark product",
+    })
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+async def upload(client, headers, session_id: str, index: int, chunk: bytes, s3=None) -> float:
+    # With `s3` (the stand-in) the chunk takes the presigned path: presign, PUT, ingest
+    start = time.perf_counter()
+    if s3 is None:
+        response = await client.post(
+            "/api/upload-chunk", headers=headers,
+            data={"sessionId": session_id, "seq": str(index)},
+            files={"file": (f"chunk_{index:05d}.wav", chunk, "audio/wav")},
+        )
+    else:
+        presigned = await client.post("/api/upload-chunk/presign", headers=headers, json={
+            "sessionId": session_id, "filename": f"chunk_{index:05d}.wav", "seq": index,
+        })
+        presigned.raise_for_status()
+        s3.put_presigned(presigned.json()["uploadUrl"], chunk)
+        response = await client.post("/api/upload-chunk/ingest", headers=headers, json={
+            "sessionId": session_id, "key": presigned.json()["key"], "seq": index,
+        })
+    elapsed = time.perf_counter() - start
+    response.raise_for_status()
+    return elapsed
+
+
+async def bench_uploads(client, headers, args, s3=None) -> dict:
+    minutes = args.chunks_per_session * args.chunk_seconds / 60
+    sessions = [await create_session(client, headers, f"upload-{i}") for i in range(args.sessions)]
+    audio = {
+        session_id: synthetic_audio.split_chunks(
+            synthetic_audio.render_meeting(minutes, args.speakers, args.seed + i), args.chunk_seconds
+        )
+        for i, session_id in enumerate(sessions)
+    }
+    latencies = []
+
+    async def run_session(session_id):
+        for index, chunk in enumerate(audio[session_id]):
+            latencies.append(await upload(client, headers, session_id, index, chunk, s3))
+            if args.chunk_interval:
+                await asyncio.sleep(args.chunk_interval)
+
+    before = metric_sums()
+    start = time.perf_counter()
+    await asyncio.gather(*(run_session(session_id) for session_id in sessions))
+    wall = time.perf_counter() - start
+    await wait_for_background_tasks()
+    drained = time.perf_counter() - start
+
+    result = summarize_latencies(latencies)
+    result.update({
+        "sessions": args.sessions,
+        "upload_mode": args.upload_mode,
+        "chunk_seconds": args.chunk_seconds,
+        "wall_seconds": round(wall, 4),
+        "chunks_per_second": round(len(latencies) / wall, 4) if wall else None,
+        "background_drain_seconds": round(drained - wall, 4),
+        "stages": metric_deltas(before, metric_sums()),
+    })
+    return result
+
+
+async def bench_finalize(client, headers, minutes: float, args, s3=None) -> dict:
+    session_id = await create_session(client, headers, f"finalize-{minutes}")
+    chunks = synthetic_audio.split_chunks(
+        synthetic_audio.render_meeting(minutes, args.speakers, args.seed), args.chunk_seconds
+    )
+    for index, chunk in enumerate(chunks):
+        await upload(client, headers, session_id, index, chunk, s3)
+    await wait_for_background_tasks()
+
+    before = metric_sums()
+    start = time.perf_counter()
+    response = await client.post("/api/finalize-session", headers=headers, json=session_id)
+    wall = time.perf_counter() - start
+    response.raise_for_status()
+    await wait_for_background_tasks()
+    total = time.perf_counter() - start
+
+    return {
+        "minutes": minutes,
+        "chunks": len(chunks),
+        "segments": len(response.json().get("results", [])),
+        "wall_seconds": round(wall, 4),
+        "with_summary_seconds": round(total, 4),
+        "stages": metric_deltas(before, metric_sums()),
+    }
+
+
+async def run(args) -> dict:
+    configure_environment(args)
+    storage_dir = tempfile.mkdtemp(prefix="sales-ai-bench-")
+
+    import httpx
+    import jwt
+    from src.main import app
+    from src.routes.auth import JWT_SECRET
+    from benchmarks.stand_ins import install_stand_ins
+
+    s3 = install_stand_ins(storage_dir, args.mongo_uri)
+
+    token = jwt.encode(
+        {"user_id": "benchmark-user", "email": "bench@example.com",
+         "exp": datetime.now(timezone.utc) + timedelta(hours=6)},
+        JWT_SECRET, algorithm="HS256",
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # httpx doesn't run the app lifespan, so enter it here: indexes, model warm-up and the task supervisor
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        response = await client.post(
+            "/api/upload-salesperson-audio", headers=headers,
+            files={"file": ("salesperson.wav", synthetic_audio.render_voice_sample(0, seed=args.seed), "audio/wav")},
+        )
+        response.raise_for_status()
+
+        presign_target = s3 if args.upload_mode == "presigned" else None
+        uploads = await bench_uploads(client, headers, args, presign_target)
+        finalize = []
+        for minutes in [float(m) for m in args.meeting_minutes.split(",") if m.strip()]:
+            finalize.append(await bench_finalize(client, headers, minutes, args, presign_target))
+            print(f"[BENCH] finalize {minutes:g} min: {finalize[-1]['wall_seconds']:.2f}s", file=sys.stderr)
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "upload": uploads,
+        "finalize": finalize,
+        "storage_bytes": s3.bytes_stored(),
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    upload = report["upload"]
+    print(f"[BENCH] upload p50={upload.get('p50_ms', 0):.1f}ms p99={upload.get('p99_ms', 0):.1f}ms "
+          f"{upload.get('chunks_per_second')} chunks/s -> {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Parity and throughput of the speaker-encoder backends.
+
+    python -m benchmarks.speaker_encoder --threads 4 --segments 64 --output bench_encoder.json
+
+Every backend/quantization combination is compared against the eager speechbrain
+EncoderClassifier on the same synthetic speech segments. A backend is usable when its
+minimum cosine similarity stays above SPEAKER_ENCODER_PARITY_TOLERANCE.
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+import torch
+
+from benchmarks import synthetic_audio
+
+VARIANTS = [("eager", False), ("eager", True), ("torchscript", False), ("torchscript", True),
+            ("onnx", False), ("onnx", True)]
+
+
+def make_segments(count: int, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    audio = synthetic_audio.render_meeting(max(1.0, count * 4 / 60), speakers=3, seed=seed)
+    segments = []
+    for _ in range(count):
+        seconds = float(rng.uniform(0.5, 6.0))
+        start = int(rng.integers(0, max(1, len(audio) - int(seconds * synthetic_audio.SAMPLE_RATE))))
+        piece = audio[start:start + int(seconds * synthetic_audio.SAMPLE_RATE)]
+        segments.append(torch.from_numpy(np.ascontiguousarray(piece)).unsqueeze(0))
+    return segments
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--segments", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_encoder.json")
+    args = parser.parse_args(argv)
+    # The torch backends use the process-wide pool; the benchmark owns its process, so it sets it
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    from speechbrain.inference.speaker import EncoderClassifier
+    from src.services.speaker_encoder import SPEAKER_ENCODER_PARITY_TOLERANCE, SpeakerEncoder, check_parity
+
+    classifier = EncoderClassifier.from_hparams(source="speechbrain/spkrec-ecapa-voxceleb", run_opts={"device": "cpu"})
+    segments = make_segments(args.segments, args.seed)
+    reference = SpeakerEncoder(classifier, "eager")
+
+    results = []
+    for backend, quantize in VARIANTS:
+        try:
+            encoder = SpeakerEncoder(classifier, backend, quantize, args.threads)
+        except Exception as e:
+            results.append({"backend": f"{backend}{'-int8' if quantize else ''}", "error": str(e)})
+            continue
+        encoder.encode(segments[0])  # warm-up
+        start = time.perf_counter()
+        for segment in segments:
+            encoder.encode(segment)
+        elapsed = time.perf_counter() - start
+        result = check_parity(encoder, reference, segments)
+        result["segments_per_second"] = round(len(segments) / elapsed, 3)
+        results.append(result)
+        print(f"[BENCH] {result['backend']:16s} {result['segments_per_second']:8.2f} seg/s "
+              f"min cos {result['min_cosine']:.5f} {'ok' if result['ok'] else 'OUT OF TOLERANCE'}", file=sys.stderr)
+
+    usable = [r for r in results if r.get("ok")]
+    report = {
+        "threads": args.threads or torch.get_num_threads(),
+        "segments": len(segments),
+        "tolerance": SPEAKER_ENCODER_PARITY_TOLERANCE,
+        "results": results,
+        "fastest_within_tolerance": max(usable, key=lambda r: r["segments_per_second"])["backend"] if usable else None,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import io
+import os
+from urllib.parse import quote, unquote, urlparse
+
+
+class LocalS3:
+    """The subset of the boto3 S3 client the services use, backed by a local directory."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, bucket: str, key: str) -> str:
+        path = os.path.join(self.root, bucket or "bucket", key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def put_object(self, Bucket: str, Key: str, Body, **kwargs):
+        data = Body.read() if hasattr(Body, "read") else Body
+        with open(self._path(Bucket, Key), "wb") as f:
+            f.write(data)
+        return {}
+
+    def get_object(self, Bucket: str, Key: str, **kwargs):
+        with open(self._path(Bucket, Key), "rb") as f:
+            return {"Body": io.BytesIO(f.read())}
+
+    def delete_object(self, Bucket: str, Key: str, **kwargs):
+        path = self._path(Bucket, Key)
+        if os.path.exists(path):
+            os.remove(path)
+        return {}
+
+    def generate_presigned_url(self, ClientMethod: str, Params: dict, ExpiresIn: int = 3600, **kwargs):
+        return f"local-s3://{Params['Bucket']}/{quote(Params['Key'])}?method={ClientMethod}&expires={ExpiresIn}"
+
+    def put_presigned(self, url: str, data: bytes):
+        # What a client's PUT to the presigned URL does on real S3
+        parsed = urlparse(url)
+        self.put_object(Bucket=parsed.netloc, Key=unquote(parsed.path.lstrip("/")), Body=data)
+
+    def bytes_stored(self) -> int:
+        total = 0
+        for directory, _, files in os.walk(self.root):
+            total += sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+        return total
+
+
+def install_stand_ins(storage_dir: str, mongo_uri: str = None, mongo_db: str = "sales_ai_benchmark"):
+    """Points the S3 and Mongo services at local stand-ins.
+
+    Without `mongo_uri` an in-memory mongomock database is used; with it, a real (local)
+    MongoDB is used so index and round-trip costs show up in the numbers.
+    """
+    from src.services import mongo_service, s3_service
+
+    s3_service.s3 = LocalS3(storage_dir)
+
+    if mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(mongo_uri)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    mongo_service.client = client
+    mongo_service.use_database(client[mongo_db])
+    return s3_service.s3
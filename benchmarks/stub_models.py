@@ -0,0 +1,197 @@
+"""Lightweight stand-ins for the model libraries the services load at import time.
+
+`install()` must run before anything under `src.services` is imported. The stubs keep the
+real call shapes (segments, annotations, embedding tensors, llama-cpp completions) so the
+whole pipeline executes, and can simulate model cost with a real-time factor so the
+surrounding I/O, merging and scheduling can be measured in isolation.
+"""
+import sys
+import time
+import types
+from collections import namedtuple
+import numpy as np
+
+from benchmarks.synthetic_audio import SAMPLE_RATE, VOICE_FUNDAMENTALS, read_wav
+
+Segment = namedtuple("Segment", "start end text")
+Turn = namedtuple("Turn", "start end")
+TranscriptionInfo = namedtuple("TranscriptionInfo", "language duration")
+
+# Seconds of simulated compute per second of audio (ASR) and tokens/second (LLM)
+settings = {"asr_rtf": 0.0, "llm_tokens_per_second": 0.0}
+
+
+def _load(source) -> np.ndarray:
+    if isinstance(source, np.ndarray):
+        return source
+    return read_wav(source)
+
+
+def _simulate(seconds: float):
+    if seconds > 0:
+        time.sleep(seconds)
+
+
+def _text(seconds: float) -> str:
+    return " ".join(["pricing", "demo", "follow", "up", "budget"][: max(1, int(seconds) % 5 + 1)])
+
+
+def _dominant_voice(audio: np.ndarray) -> int:
+    if not len(audio):
+        return 0
+    spectrum = np.abs(np.fft.rfft(audio))
+    peak = np.fft.rfftfreq(len(audio), 1 / SAMPLE_RATE)[int(np.argmax(spectrum))]
+    return int(np.argmin([abs(peak - f) for f in VOICE_FUNDAMENTALS]))
+
+
+# faster_whisper
+class WhisperModel:
+    def __init__(self, model_size_or_path="base", **kwargs):
+        self.model_size = model_size_or_path
+        # English-only, so language detection is skipped as for the real .en models
+        self.model = types.SimpleNamespace(is_multilingual=False)
+
+    def transcribe(self, audio, **kwargs):
+        audio = _load(audio)
+        seconds = len(audio) / SAMPLE_RATE
+        _simulate(seconds * settings["asr_rtf"])
+        return iter([Segment(0.0, seconds, _text(seconds))]), TranscriptionInfo("en", seconds)
+
+    def detect_language(self, audio=None, **kwargs):
+        return "en", 1.0, [("en", 1.0)]
+
+
+class BatchedInferencePipeline:
+    def __init__(self, model, **kwargs):
+        self.model = model
+
+    def transcribe(self, audio, clip_timestamps=None, **kwargs):
+        # Like the real pipeline, every clip (given in seconds) is decoded as its own window
+        audio = _load(audio)
+        clips = clip_timestamps or [{"start": 0, "end": len(audio) / SAMPLE_RATE}]
+        # A batch is priced like one pass over its longest clip, as on real batched hardware
+        longest = max((c["end"] - c["start"]) for c in clips)
+        _simulate(longest * settings["asr_rtf"])
+        segments = []
+        for c in clips:
+            # Padding at the end of a clip is silence and gets no words
+            window = np.trim_zeros(audio[int(c["start"] * SAMPLE_RATE):int(c["end"] * SAMPLE_RATE)], "b")
+            if len(window):
+                seconds = len(window) / SAMPLE_RATE
+                segments.append(Segment(c["start"], c["start"] + seconds, _text(seconds)))
+        return iter(segments), TranscriptionInfo("en", len(audio) / SAMPLE_RATE)
+
+
+def decode_audio(input_file, sampling_rate=SAMPLE_RATE, **kwargs):
+    return read_wav(input_file)
+
+
+# openai-whisper
+class _OpenAIWhisper:
+    def __init__(self, name):
+        self.name = name
+
+    def transcribe(self, audio, **kwargs):
+        audio = _load(audio)
+        seconds = len(audio) / SAMPLE_RATE
+        _simulate(seconds * settings["asr_rtf"])
+        return {"text": _text(seconds)}
+
+
+def load_model(name, **kwargs):
+    return _OpenAIWhisper(name)
+
+
+def load_audio(file, sr=SAMPLE_RATE):
+    return read_wav(file)
+
+
+# pyannote.audio
+class _Annotation:
+    def __init__(self, tracks):
+        self._tracks = tracks
+
+    def itertracks(self, yield_label=False):
+        for turn, label in self._tracks:
+            yield (turn, None, label) if yield_label else (turn, None)
+
+
+class Pipeline:
+    window_seconds = 2.0
+
+    @classmethod
+    def from_pretrained(cls, *args, **kwargs):
+        return cls()
+
+    def __call__(self, path, **kwargs):
+        audio = _load(path)
+        step = int(self.window_seconds * SAMPLE_RATE)
+        tracks = []
+        for start in range(0, len(audio), step):
+            label = f"SPEAKER_{_dominant_voice(audio[start:start + step]):02d}"
+            end = min(start + step, len(audio)) / SAMPLE_RATE
+            if tracks and tracks[-1][1] == label:
+                tracks[-1] = (Turn(tracks[-1][0].start, end), label)
+            else:
+                tracks.append((Turn(start / SAMPLE_RATE, end), label))
+        return _Annotation(tracks)
+
+
+# speechbrain.inference.speaker
+class EncoderClassifier:
+    bands = 192
+
+    @classmethod
+    def from_hparams(cls, *args, **kwargs):
+        return cls()
+
+    def encode_batch(self, wavs, *args, **kwargs):
+        import torch
+        signals = wavs.detach().cpu().numpy().reshape(wavs.shape[0], -1)
+        embeddings = []
+        for signal in signals:
+            spectrum = np.abs(np.fft.rfft(signal)) if len(signal) else np.zeros(self.bands + 1)
+            bands = np.array_split(spectrum[: len(spectrum) // 8 or 1], self.bands)
+            vector = np.log1p(np.array([b.mean() if len(b) else 0.0 for b in bands], dtype=np.float32))
+            embeddings.append(vector)
+        return torch.from_numpy(np.stack(embeddings)).unsqueeze(1)
+
+
+# llama_cpp
+class Llama:
+    def __init__(self, model_path=None, **kwargs):
+        self.model_path = model_path
+
+    def __call__(self, prompt, max_tokens=16, **kwargs):
+        completion_tokens = min(max_tokens, 64)
+        if settings["llm_tokens_per_second"] > 0:
+            _simulate(completion_tokens / settings["llm_tokens_per_second"])
+        return {
+            "choices": [{"text": "Ask about budget and timeline before the demo."}],
+            "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": completion_tokens},
+        }
+
+
+def _module(name: str, **attrs) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+def install(asr_rtf: float = 0.0, llm_tokens_per_second: float = 0.0):
+    settings["asr_rtf"] = asr_rtf
+    settings["llm_tokens_per_second"] = llm_tokens_per_second
+    modules = {
+        "faster_whisper": _module(
+            "faster_whisper", WhisperModel=WhisperModel,
+            BatchedInferencePipeline=BatchedInferencePipeline, decode_audio=decode_audio,
+        ),
+        "whisper": _module("whisper", load_model=load_model, load_audio=load_audio),
+        "pyannote": _module("pyannote"),
+        "pyannote.audio": _module("pyannote.audio", Pipeline=Pipeline),
+        "speechbrain": _module("speechbrain"),
+        "speechbrain.inference": _module("speechbrain.inference"),
+        "speechbrain.inference.speaker": _module("speechbrain.inference.speaker", EncoderClassifier=EncoderClassifier),
+        "llama_cpp": _module("llama_cpp", Llama=Llama),
+    }
+    sys.modules.update(modules)
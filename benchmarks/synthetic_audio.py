@@ -0,0 +1,72 @@
+import io
+import wave
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# Each synthetic voice is a harmonic stack around its own fundamental, so diarization and
+# speaker embeddings have something stable to separate even with stub models
+VOICE_FUNDAMENTALS = [110.0, 165.0, 220.0, 290.0]
+
+
+def _voice(fundamental: float, seconds: float, rng: np.random.Generator) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    # Slow pitch wobble and a syllable-rate envelope make it look a little like speech
+    pitch = fundamental * (1 + 0.03 * np.sin(2 * np.pi * 0.7 * t + rng.uniform(0, np.pi)))
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    signal = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4.0 * t + rng.uniform(0, np.pi)))
+    return (signal * envelope).astype(np.float32)
+
+
+def meeting_turns(minutes: float, speakers: int = 2, seed: int = 0):
+    """Yields (speaker_index, seconds) turns covering the whole meeting."""
+    rng = np.random.default_rng(seed)
+    remaining = minutes * 60
+    speaker = 0
+    while remaining > 0:
+        seconds = float(min(remaining, rng.uniform(2.0, 12.0)))
+        yield speaker, seconds
+        remaining -= seconds
+        speaker = (speaker + int(rng.integers(1, speakers))) % speakers if speakers > 1 else 0
+
+
+def render_meeting(minutes: float, speakers: int = 2, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    parts = [
+        _voice(VOICE_FUNDAMENTALS[speaker % len(VOICE_FUNDAMENTALS)], seconds, rng)
+        for speaker, seconds in meeting_turns(minutes, speakers, seed)
+    ]
+    audio = np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+    audio += 0.01 * rng.standard_normal(len(audio)).astype(np.float32)
+    return audio / max(1e-6, float(np.abs(audio).max())) * 0.8
+
+
+def render_voice_sample(speaker: int = 0, seconds: float = 10.0, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    return to_wav_bytes(_voice(VOICE_FUNDAMENTALS[speaker % len(VOICE_FUNDAMENTALS)], seconds, rng))
+
+
+def to_wav_bytes(audio: np.ndarray) -> bytes:
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def split_chunks(audio: np.ndarray, chunk_seconds: float) -> list:
+    step = int(chunk_seconds * SAMPLE_RATE)
+    return [to_wav_bytes(audio[i:i + step]) for i in range(0, len(audio), step)]
+
+
+def read_wav(source) -> np.ndarray:
+    with wave.open(source, "rb") as wav:
+        frames = wav.readframes(wav.getnframes())
+        audio = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+        if wav.getnchannels() > 1:
+            audio = audio.reshape(-1, wav.getnchannels()).mean(axis=1)
+    return audio
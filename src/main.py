@@ -112,15 +112,53 @@
 # print("\n✅ Transcription complete. Results saved to 'transcription_results.json'.")
 
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from src.routes.audio import router as audio_router
-from src.routes.auth import router as auth_router
+from src.routes.auth import router as auth_router, decode_token
 from src.routes.suggestion import router as suggestion_router
 from src.routes.chatBot import router as chatbot 
-
-app = FastAPI(title="Audio Uploader with Transcription & Diarization")
+from src.routes.search import router as search_router
+from src.services import mongo_service
+from src.services.metrics import render_metrics
+from src.services.profiling import ProfilingMiddleware, wait_for_profile_saves
+from src.services.asr_profiles import get_engine, LIVE_ASR_PROFILE, FINALIZE_ASR_PROFILE
+from src.services.task_supervisor import supervisor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One Mongo client (and connection pool) for the whole app
+    mongo_service.connect()
+    await mongo_service.ensure_indexes()
+    # Load the default ASR models up front so the first chunk and finalize don't pay for it
+    for profile in {LIVE_ASR_PROFILE, FINALIZE_ASR_PROFILE}:
+        await asyncio.to_thread(lambda: get_engine(profile).model)
+    # Background workers start after the models, and replay tasks checkpointed by the last shutdown
+    await supervisor.start()
+    try:
+        yield
+    finally:
+        # Finish what's queued within TASK_DRAIN_TIMEOUT_SECONDS, checkpoint the rest
+        await supervisor.shutdown()
+        # Profiles of the last requests are stored before the pool closes too
+        await wait_for_profile_saves()
+        # Writes buffered by the write-behind go out before the pool closes
+        await mongo_service.close()
+
+
+app = FastAPI(title="Audio Uploader with Transcription & Diarization", lifespan=lifespan)
+app.add_middleware(ProfilingMiddleware, authenticate=decode_token)
 
 app.include_router(audio_router, prefix="/api")
 app.include_router(auth_router, prefix="/api/auth", tags=["Auth"])
 app.include_router(suggestion_router, prefix="/api/sg")
 app.include_router(chatbot,  prefix="/api/chat")
+app.include_router(search_router, prefix="/api", tags=["Search"])
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from bson import ObjectId
 
 class MeetingCreate(BaseModel):
@@ -10,6 +10,9 @@ class MeetingCreate(BaseModel):
     participants: int
     product_details: Optional[str] = None
     scheduled_time: Optional[str] = None
+    asr_profile: Optional[str] = None
+    # Other words or phrases that count as covering a topic, e.g. {"Pricing": ["cost", "budget"]}
+    topic_synonyms: Optional[Dict[str, List[str]]] = None
 
 class MeetingResponse(MeetingCreate):
     id: str
@@ -28,5 +31,7 @@ def meeting_doc_to_response(doc):
         topics=doc.get("topics", []),
         persons=doc.get("persons", []),
         product_details=doc.get("product_details"),
-        scheduled_time=doc.get("scheduled_time")
+        scheduled_time=doc.get("scheduled_time"),
+        asr_profile=doc.get("asr_profile"),
+        topic_synonyms=doc.get("topic_synonyms")
     )
@@ -1,30 +1,84 @@
 from typing import List
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Body, Depends
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Body, Depends, Query
 import uuid, tempfile, os
 import asyncio
+import hashlib
 import json
+import csv
+import io
+from typing import Optional
+from fastapi.responses import StreamingResponse
 from collections import defaultdict
+from datetime import datetime, timedelta
+from bson import ObjectId
 
 from src.services.prediction_models_service import run_instruction
 from src.services.speaker_identification import load_reference_embedding, process_segments, run_diarization
-from src.services.s3_service import upload_file_to_s3, download_file_from_s3
-from src.services.mongo_service import get_salesperson_sample, save_chunk_metadata, get_chunk_list, save_final_audio, save_suggestion, update_final_summary_and_suggestion
+from src.services.s3_service import upload_file_to_s3, download_file_from_s3, delete_file_from_s3, generate_presigned_upload_url, s3_object_url, PRESIGNED_UPLOAD_EXPIRES_SECONDS
+from src.services.mongo_service import save_chunk_metadata, get_chunk_list, save_final_audio, save_suggestion, update_final_summary_and_suggestion, build_transcript, iter_final_segments
 from src.services.audio_merge_service import merge_audio_chunks
+from src.services.audio_codec import encode_for_storage, encode_file_for_storage, storage_name, AUDIO_STORAGE_CODEC
+from src.services.chunk_cache import chunk_cache
 from src.services.whisper_service import transcribe_audio
 from src.services.diarization_service import diarize_audio
 from src.services.mongo_service import save_salesperson_sample
 
-from src.services.transcription_service import transcribe_audio_bytes
-from src.services.mongo_service import save_transcription_chunk
-from src.utils import extract_filename_from_s3_url
+from src.services.transcription_service import transcribe_chunk
+from src.services.mongo_service import save_transcription_chunk, find_chunk
+from src.services.mongo_service import save_presigned_upload, get_presigned_upload, claim_presigned_upload, release_presigned_upload, complete_presigned_upload
+from src.utils import extract_filename_from_s3_url, TTLCache
 
 
 from src.models.meeting_model import GetMeetingsById, MeetingCreate, MeetingResponse, meeting_doc_to_response
-from src.services.mongo_service import create_meeting, get_all_meetings, get_meeting_by_id
+from src.services.mongo_service import create_meeting, find_meetings, get_meeting_by_id, update_meeting
+from src.routes.pagination import PageParams, stream_page
 from src.routes.auth import verify_token
+from src.services.metrics import stage
+from src.services.task_supervisor import supervisor
+from src.services.profiling import profiled_task, tag_profile_session, is_profiling_admin
+from src.services.mongo_service import get_profiles_for_session, save_session_voices, name_session_voice, rename_final_speaker
+from src.services.asr_profiles import get_engine, list_profiles
+from src.services.topic_matcher import track_topic_coverage
+from src.services.session_context import get_session_context, invalidate_session_context, invalidate_user_session_contexts
+from src.services.speaker_index import load_speaker_index, add_to_loaded_index, embedding_to_bytes, embedding_from_bytes
 
 router = APIRouter()
 
+# Transcripts by (content hash, ASR profile), so re-sent audio is never transcribed twice
+_transcript_cache = TTLCache(
+    maxsize=int(os.getenv("CHUNK_TRANSCRIPT_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("CHUNK_TRANSCRIPT_CACHE_TTL_SECONDS", "3600")),
+)
+# Upload responses by (sessionId, seq, content hash), answering client retries from memory
+_ingested_chunks = TTLCache(
+    maxsize=int(os.getenv("CHUNK_INGEST_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("CHUNK_INGEST_CACHE_TTL_SECONDS", "3600")),
+)
+# Ingestions still running; a retry that arrives meanwhile waits for the same task
+_ingesting = {}
+# How long after its upload URL expires a presigned key can still be ingested (or retried)
+PRESIGNED_INGEST_GRACE_SECONDS = int(os.getenv("PRESIGNED_INGEST_GRACE_SECONDS", "3600"))
+# How long an ingest may hold its key before a retry on another worker can take it over
+PRESIGNED_INGEST_LEASE_SECONDS = int(os.getenv("PRESIGNED_INGEST_LEASE_SECONDS", "300"))
+
+
+def resolve_asr_profile(*candidates: Optional[str]) -> Optional[str]:
+    # First profile named wins (endpoint, then meeting); None leaves the service default
+    for name in candidates:
+        if name:
+            try:
+                return get_engine(name).name
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+    return None
+
+
+async def load_session_context(sessionId: str, userId: str):
+    try:
+        return await get_session_context(sessionId, userId)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
 
 
 @router.post("/upload-salesperson-audio")
@@ -47,6 +101,7 @@ async def upload_salesperson_audio(
         s3_url=s3_url,
         userId=userId
     )
+    invalidate_user_session_contexts(userId)
 
     return {
         "message": "Audio sample uploaded",
@@ -60,58 +115,200 @@ async def upload_chunk(
     file: UploadFile = File(...),
     sessionId: str = Form(...),
     # userId: str = Form(...),
+    seq: Optional[int] = Form(None, ge=0, description="Client sequence number of the chunk; makes retries idempotent"),
+    asrProfile: Optional[str] = Query(None, description="ASR profile for this chunk, e.g. fast/balanced/accurate"),
     token_data: dict = Depends(verify_token)
 ):
     userId = token_data["user_id"]
     if not sessionId or not file.filename:
         raise HTTPException(status_code=400, detail="Missing sessionId or file")
-
-    # Upload chunk to S3
-    chunk_name = f"audio_recording/{sessionId}_{uuid.uuid4()}_{file.filename}"
+    tag_profile_session(sessionId)
+    context = await load_session_context(sessionId, userId)
+    asr_profile = resolve_asr_profile(asrProfile, context.asr_profile)
     content = await file.read()
-    s3_url = upload_file_to_s3(chunk_name, content)
+    return await _ingest_chunk(sessionId, userId, content, file.filename, seq, asr_profile)
 
-    # Transcribe the uploaded audio chunk
-    transcript = transcribe_audio_bytes(content)
 
-    # Save the chunk metadata
-    await save_chunk_metadata(sessionId, chunk_name, userId, transcript, s3_url)
+@router.post("/upload-chunk/presign")
+async def presign_chunk_upload(
+    sessionId: str = Body(...),
+    filename: str = Body(...),
+    seq: Optional[int] = Body(None, ge=0),
+    token_data: dict = Depends(verify_token)
+):
+    # The client PUTs the chunk straight to S3 with the returned URL, then calls /upload-chunk/ingest
+    if not sessionId or not filename:
+        raise HTTPException(status_code=400, detail="Missing sessionId or filename")
+    userId = token_data["user_id"]
+    await load_session_context(sessionId, userId)
+    prefix = f"{seq:06d}_" if seq is not None else ""
+    key = f"audio_recording/{sessionId}_{prefix}{uuid.uuid4().hex}_{os.path.basename(filename)}"
+    # Only keys issued here can be ingested, once each, by the same user and session
+    expires_at = datetime.utcnow() + timedelta(seconds=PRESIGNED_UPLOAD_EXPIRES_SECONDS + PRESIGNED_INGEST_GRACE_SECONDS)
+    await save_presigned_upload(key, sessionId, userId, seq, expires_at)
+    return {
+        "uploadUrl": generate_presigned_upload_url(key),
+        "key": key,
+        "method": "PUT",
+        "expiresIn": PRESIGNED_UPLOAD_EXPIRES_SECONDS,
+    }
+
 
-    # ✅ Fire-and-forget the heavy suggestion task
-    asyncio.create_task(handle_post_processing(sessionId, userId))
+@router.post("/upload-chunk/ingest")
+async def ingest_uploaded_chunk(
+    sessionId: str = Body(...),
+    key: str = Body(..., description="Key returned by /upload-chunk/presign"),
+    seq: Optional[int] = Body(None, ge=0),
+    asrProfile: Optional[str] = Query(None, description="ASR profile for this chunk, e.g. fast/balanced/accurate"),
+    token_data: dict = Depends(verify_token)
+):
+    userId = token_data["user_id"]
+    upload = await get_presigned_upload(key, sessionId, userId)
+    if upload is None:
+        raise HTTPException(status_code=400, detail="Key was not issued by /upload-chunk/presign for this session")
+    if upload.get("result") is not None:
+        return {**upload["result"], "duplicate": True}
+    if seq is not None and seq != upload["seq"]:
+        raise HTTPException(status_code=400, detail="seq differs from the one the key was issued for")
+    tag_profile_session(sessionId)
+    context = await load_session_context(sessionId, userId)
+    asr_profile = resolve_asr_profile(asrProfile, context.asr_profile)
+
+    # Only the request that claims the key ingests it; a concurrent retry must not append it again
+    if await claim_presigned_upload(key, sessionId, userId, PRESIGNED_INGEST_LEASE_SECONDS) is None:
+        upload = await get_presigned_upload(key, sessionId, userId)
+        if upload is not None and upload.get("result") is not None:
+            return {**upload["result"], "duplicate": True}
+        raise HTTPException(status_code=409, detail="Chunk is already being ingested; retry shortly")
+    try:
+        try:
+            content = await asyncio.to_thread(download_file_from_s3, key)
+        except Exception:
+            raise HTTPException(status_code=404, detail="Uploaded chunk not found")
+        result = await _ingest_chunk(sessionId, userId, content, f"chunk{os.path.splitext(key)[1]}", upload["seq"], asr_profile, uploaded_key=key)
+    except BaseException:
+        await asyncio.shield(release_presigned_upload(key))
+        raise
+    await complete_presigned_upload(key, {k: v for k, v in result.items() if k != "duplicate"})
+    # Re-encoded or duplicate uploads leave the client's object unused
+    if result["chunk"] != key:
+        await asyncio.to_thread(delete_file_from_s3, key)
+    return result
+
+
+async def _ingest_chunk(sessionId: str, userId: str, content: bytes, filename: str,
+                        seq: Optional[int], asr_profile: Optional[str], uploaded_key: Optional[str] = None) -> dict:
+    # A chunk is identified by its content hash plus the client's sequence number; a
+    # duplicate gets the stored result back without touching S3, ASR or the LLM
+    content_hash = hashlib.sha256(content).hexdigest()
+    if seq is None:
+        # Without a seq identical chunks (e.g. silence) are legitimately repeated; always store
+        return await asyncio.shield(
+            asyncio.create_task(_store_chunk(sessionId, userId, content, content_hash, filename, seq, asr_profile, uploaded_key))
+        )
+    key = (sessionId, seq, content_hash)
+    cached = _ingested_chunks.get(key)
+    if cached is not None:
+        return {**cached, "duplicate": True}
 
-    # ✅ Send response immediately
+    task = _ingesting.get(key)
+    if task is not None:
+        return {**await asyncio.shield(task), "duplicate": True}
+
+    task = asyncio.create_task(
+        _store_chunk(sessionId, userId, content, content_hash, filename, seq, asr_profile, uploaded_key)
+    )
+    _ingesting[key] = task
+    task.add_done_callback(lambda _: _ingesting.pop(key, None))
+    # Shielded, so a client that disconnects mid-upload doesn't abort the ingestion its retry will wait on
+    return await asyncio.shield(task)
+
+
+async def _store_chunk(sessionId: str, userId: str, content: bytes, content_hash: str, filename: str,
+                       seq: Optional[int], asr_profile: Optional[str], uploaded_key: Optional[str] = None) -> dict:
+    key = (sessionId, seq, content_hash)
+    stored = await find_chunk(sessionId, userId, content_hash, seq) if seq is not None else None
+    if stored is not None:
+        result = _chunk_response(stored["chunk_name"], stored["s3_url"], stored.get("transcript"), seq)
+        _ingested_chunks.set(key, result)
+        return {**result, "duplicate": True}
+
+    if uploaded_key and AUDIO_STORAGE_CODEC == "wav":
+        # Uploaded straight to S3 by the client and already in its stored form
+        chunk_name = uploaded_key
+        s3_url = s3_object_url(uploaded_key)
+        stored_bytes = content
+    else:
+        # Upload chunk to S3, transcoded to the storage codec, under a name derived from its content
+        prefix = f"{seq:06d}_" if seq is not None else ""
+        chunk_name = f"audio_recording/{sessionId}_{prefix}{content_hash[:16]}_{storage_name(filename)}"
+        stored_bytes = await asyncio.to_thread(encode_for_storage, content)
+        s3_url = upload_file_to_s3(chunk_name, stored_bytes)
+    # Finalize usually runs on this node too and then reads the chunk from here instead of S3
+    await asyncio.to_thread(chunk_cache.put, chunk_name, stored_bytes)
+
+    # Transcribe the uploaded audio chunk (batched with other in-flight chunks)
+    transcript_key = (content_hash, asr_profile)
+    transcript = _transcript_cache.get(transcript_key)
+    if transcript is None:
+        transcript = await transcribe_chunk(content, asr_profile)
+        _transcript_cache.set(transcript_key, transcript)
+
+    # Save the chunk metadata; another worker may have recorded the same chunk meanwhile
+    added = await save_chunk_metadata(sessionId, chunk_name, userId, transcript, s3_url, content_hash, seq)
+
+    topics_covered = []
+    if added:
+        context = await get_session_context(sessionId, userId)
+        if context.topics is not None:
+            topics_covered = await track_topic_coverage(context.topics, sessionId, userId, transcript, seq)
+        # ✅ Queue the heavy suggestion task; one already waiting for this session covers this chunk too
+        supervisor.submit("live_suggestion", sessionId, userId, key=sessionId)
+
+    elif seq is not None:
+        # The chunk another worker recorded is the one kept; ours (e.g. the client's upload) is unused
+        stored = await find_chunk(sessionId, userId, content_hash, seq)
+        if stored is not None:
+            chunk_name, s3_url = stored["chunk_name"], stored["s3_url"]
+
+    result = _chunk_response(chunk_name, s3_url, transcript, seq, topics_covered)
+    if seq is not None:
+        _ingested_chunks.set(key, result)
+    return {**result, "duplicate": not added}
+
+
+def _chunk_response(chunk_name: str, s3_url: str, transcript: str, seq: Optional[int],
+                    topics_covered: Optional[list] = None) -> dict:
     return {
         "message": "Chunk uploaded",
         "chunk": chunk_name,
         "s3_url": s3_url,
         "transcript": transcript,
+        "seq": seq,
+        "topicsCovered": topics_covered or [],
     }
 
 
-# 🔁 This runs in background
+# 🔁 This runs in background, on the task supervisor's "live_suggestion" workers
+@profiled_task("handle_post_processing")
 async def handle_post_processing(sessionId: str, userId: str):
-    try:
-        # Get all previous transcripts
-        chunk_list = await get_chunk_list(sessionId)
-        full_transcript = "\n".join(chunk["transcript"] for chunk in chunk_list if "transcript" in chunk)
-
-        # Get meeting info
-        meeting = await get_meeting_by_id(sessionId)
-        description = meeting.get("description", "")
-        product_details = meeting.get("product_details", "")
+    # Get all previous transcripts
+    chunk_list = await get_chunk_list(sessionId)
+    full_transcript = build_transcript([chunk.get("transcript") for chunk in chunk_list])
+    chunk_range = (0, len(chunk_list))
 
-        # Run LLM
-        instruction = f"Suggest improvements for this meeting segment. Meeting Description: {description}. Product Details: {product_details}."
-        suggestions = run_instruction(instruction, f"Transcript:\n{full_transcript}")
-        print(f"suggestion result is ............. {suggestions}")
-        # Save suggestions
-        await save_suggestion(sessionId, userId, transcript=full_transcript, suggestion=suggestions)
-
-    except Exception as e:
-        # Optionally log the error
-        print(f"Error in background processing: {e}")
+    # Meeting info and prompt prefix come from the session context, loaded once per session
+    context = await get_session_context(sessionId, userId)
 
+    # Run LLM
+    instruction = context.live_instruction
+    if context.topics and context.topics.not_covered():
+        instruction += f" Topics not yet covered: {', '.join(context.topics.not_covered())}."
+    with stage("live_suggestion_llm"):
+        suggestions = await run_instruction(instruction, f"Transcript:\n{full_transcript}")
+    print(f"suggestion result is ............. {suggestions}")
+    # Save suggestions
+    await save_suggestion(sessionId, userId, transcript=None, suggestion=suggestions, chunk_range=chunk_range)
 
 
 @router.post("/upload-audio-chunk")
@@ -132,13 +329,13 @@ async def upload_audio_chunk(
     audio_bytes = await file.read()
 
     # Generate unique filename
-    unique_name = f"audio_recording/{sessionId}_{uuid.uuid4()}.wav"
+    unique_name = f"audio_recording/{storage_name(f'{sessionId}_{uuid.uuid4()}.wav')}"
 
     # Upload chunk to S3
-    s3_url = upload_file_to_s3(unique_name, audio_bytes)
+    s3_url = upload_file_to_s3(unique_name, await asyncio.to_thread(encode_for_storage, audio_bytes))
 
     # Transcribe the chunk
-    transcript = transcribe_audio_bytes(audio_bytes)
+    transcript = await transcribe_chunk(audio_bytes)
 
     # Optional: Store transcription metadata in MongoDB
     doc_id = await save_transcription_chunk(sessionId, s3_url, transcript,userId)
@@ -154,11 +351,15 @@ async def upload_audio_chunk(
 async def finalize_session(
     sessionId: str = Body(...), 
     # userId: str = Body(...),
+    asrProfile: Optional[str] = Query(None, description="ASR profile for the final transcript; defaults to the meeting's"),
     token_data: dict = Depends(verify_token)
 ):
     userId = token_data["user_id"]
     if not sessionId:
         raise HTTPException(status_code=400, detail="Missing sessionId")
+    tag_profile_session(sessionId)
+    context = await load_session_context(sessionId, userId)
+    asr_profile = resolve_asr_profile(asrProfile, context.asr_profile)
 
     chunk_keys = await get_chunk_list(sessionId)
     if not chunk_keys:
@@ -170,59 +371,75 @@ async def finalize_session(
     sample_path = None
 
     try:
-        # Download chunk files from S3 and save locally
-        for item in chunk_keys:
-            key = item["chunk_name"]
-            local_filename = os.path.basename(key)
-            local_path = os.path.join(temp_dir, local_filename)
-
-            file_data = download_file_from_s3(key)
-            with open(local_path, "wb") as f:
-                f.write(file_data)
-
-            local_files.append(local_path)
-
-        # Merge chunks
+        # Take chunk files from this node's cache, downloading from S3 only what isn't there
+        with stage("finalize_download_chunks"):
+            for item in chunk_keys:
+                key = item["chunk_name"]
+                local_filename = os.path.basename(key)
+                local_path = os.path.join(temp_dir, local_filename)
+
+                if not await asyncio.to_thread(chunk_cache.copy_to, key, local_path):
+                    file_data = download_file_from_s3(key)
+                    with open(local_path, "wb") as f:
+                        f.write(file_data)
+                    # A retried finalize of this session won't download it again
+                    await asyncio.to_thread(chunk_cache.put, key, file_data)
+
+                local_files.append(local_path)
+
+        # Merge chunks (decoded from whatever codec they were stored in) into one WAV
         final_path = os.path.join(temp_dir, f"{sessionId}_merged.wav")
-        merge_audio_chunks(local_files, final_path)
+        with stage("finalize_merge"):
+            merge_audio_chunks(local_files, final_path)
 
-         # If upload_file_to_s3 is async, await it
-        with open(final_path, "rb") as f:
-            s3_url = upload_file_to_s3(f"final_recording/{sessionId}_merged.wav", f.read())
+        with stage("finalize_upload_merged"):
+            merged = await asyncio.to_thread(encode_file_for_storage, final_path)
+            s3_url = upload_file_to_s3(f"final_recording/{storage_name(f'{sessionId}_merged.wav')}", merged)
 
         # Fetch salesperson sample from DB
-        sample_url = await get_salesperson_sample(userId)
-        s3_sample_key = extract_filename_from_s3_url(sample_url["s3_url"])  # gets `audio_salesperson_samples/...`
+        with stage("finalize_reference_embedding"):
+            sample_url = context.salesperson_sample
+            if not sample_url:
+                raise HTTPException(status_code=400, detail="No salesperson sample uploaded")
+            s3_sample_key = extract_filename_from_s3_url(sample_url["s3_url"])  # gets `audio_salesperson_samples/...`
 
-        # Download and save salesperson sample locally
-        sample_path = os.path.join(temp_dir, os.path.basename(s3_sample_key))
-        sample_file_data = download_file_from_s3(s3_sample_key)
-        with open(sample_path, "wb") as sf:
-            sf.write(sample_file_data)
+            # Download and save salesperson sample locally
+            sample_path = os.path.join(temp_dir, os.path.basename(s3_sample_key))
+            sample_file_data = download_file_from_s3(s3_sample_key)
+            with open(sample_path, "wb") as sf:
+                sf.write(sample_file_data)
 
-        # Load reference embedding from local sample file
-        ref_embedding = load_reference_embedding(sample_path)
+            # Load reference embedding from local sample file
+            ref_embedding = load_reference_embedding(sample_path)
 
         # Run diarization and process
-        diarization = run_diarization(final_path)
-        results = process_segments(diarization, final_path, ref_embedding)
-         # If upload_file_to_s3 is async, await it
-        with open(final_path, "rb") as f:
-         s3_url = upload_file_to_s3(f"final_recording/{sessionId}_merged.wav", f.read())
-
-         transcript = ""
-         speakers = []
-
-         doc_id = await save_final_audio(sessionId, s3_url, results, userId)
-
-           # ✅ Run summarization in background
-         asyncio.create_task(handle_finalize_post_processing(sessionId, userId, results))
-
-         return {
+        with stage("finalize_diarization"):
+            diarization = run_diarization(final_path)
+        speaker_index = await load_speaker_index(userId)
+        with stage("finalize_segments"):
+            results, voices = process_segments(diarization, final_path, ref_embedding, speaker_index, asr_profile)
+
+        doc_id = await save_final_audio(sessionId, s3_url, results, userId)
+
+        # Enroll this meeting's voices; ones the index recognised are stored under that name
+        known_names = set(speaker_index.labels)
+        voice_ids = await save_session_voices(userId, sessionId, [{
+            "label": label,
+            "name": label if label in known_names else None,
+            "embedding": embedding_to_bytes(embedding),
+        } for label, embedding in voices.items()])
+        for voice_id, (label, embedding) in zip(voice_ids, voices.items()):
+            if label in known_names:
+                add_to_loaded_index(userId, voice_id, label, embedding)
+
+        # ✅ Run summarization in background
+        supervisor.submit("finalize_summary", sessionId, userId, results)
+
+        return {
             "id": str(doc_id),
             "transcript": "",
             "results":results
-         }
+        }
 
     finally:
         for file in local_files:
@@ -234,12 +451,11 @@ async def finalize_session(
             os.remove(sample_path)
 
 
+@profiled_task("handle_finalize_post_processing")
 async def handle_finalize_post_processing(sessionId: str, userId: str, transcript: str):
     try:
         # Get meeting metadata
-        meeting = await get_meeting_by_id(sessionId)
-        description = meeting.get("description", "")
-        product_details = meeting.get("product_details", "")
+        context = await get_session_context(sessionId, userId)
 
         # --- Step 1: Parse Transcript ---
         try:
@@ -255,30 +471,117 @@ async def handle_finalize_post_processing(sessionId: str, userId: str, transcrip
             if text:
                 formatted_transcript += f"{speaker}: {text}\n"
 
-        # --- Step 3: Prepare LLM Instructions ---
-        summary_instruction = (
-            f"Summarize the following meeting in a concise paragraph.\n"
-            f"Meeting Description: {description}\n"
-            f"Product Details: {product_details}"
-        )
-
-        suggestion_instruction = (
-            f"Suggest improvements based on the following meeting.\n"
-            f"Meeting Description: {description}\n"
-            f"Product Details: {product_details}"
-        )
-
-        # --- Step 4: Call LLM ---
-        summary = run_instruction(summary_instruction, f"Transcript:\n{formatted_transcript}")
-        suggestion = run_instruction(suggestion_instruction, f"Transcript:\n{formatted_transcript}")
+        # --- Step 3: Call LLM with the session's prepared instructions ---
+        # Deterministic, so a replayed finalize reuses the cached responses instead of generating again
+        with stage("finalize_summary_llm"):
+            summary = await run_instruction(context.summary_instruction, f"Transcript:\n{formatted_transcript}", temperature=0.0)
+        with stage("finalize_suggestion_llm"):
+            suggestion = await run_instruction(context.suggestion_instruction, f"Transcript:\n{formatted_transcript}", temperature=0.0)
 
         print(f"📄 Summary:\n{summary}\n\n💡 Suggestions:\n{suggestion}")
 
-        # --- Step 5: Save to DB ---
+        # --- Step 4: Save to DB ---
         await update_final_summary_and_suggestion(sessionId, userId, summary, suggestion)
 
-    except Exception as e:
-        print(f"❌ Error in finalize post-processing: {e}")
+    finally:
+        # The session is done; its context isn't needed any more
+        invalidate_session_context(sessionId)
+
+
+# Background work started by chunk uploads and finalize; run by the supervisor the app lifespan starts
+supervisor.register(
+    "live_suggestion", handle_post_processing,
+    concurrency=int(os.getenv("LIVE_SUGGESTION_CONCURRENCY", "2")),
+    max_queue=int(os.getenv("LIVE_SUGGESTION_QUEUE_SIZE", "200")),
+)
+supervisor.register(
+    "finalize_summary", handle_finalize_post_processing,
+    concurrency=int(os.getenv("FINALIZE_SUMMARY_CONCURRENCY", "1")),
+    max_queue=int(os.getenv("FINALIZE_SUMMARY_QUEUE_SIZE", "500")),
+)
+
+
+@router.get("/asr-profiles")
+async def get_asr_profiles(token_data: dict = Depends(verify_token)):
+    # Configuration of every profile plus its measured real-time factor in this process
+    return list_profiles()
+
+
+@router.post("/speakers/name")
+async def name_speaker(
+    sessionId: str = Body(...),
+    speaker: str = Body(..., description="Label the speaker got in this session, e.g. 'Speaker 1'"),
+    name: str = Body(...),
+    token_data: dict = Depends(verify_token)
+):
+    userId = token_data["user_id"]
+    voice = await name_session_voice(userId, sessionId, speaker, name)
+    if not voice:
+        raise HTTPException(status_code=404, detail="Speaker not found in this session")
+
+    # Later meetings of this user recognise the voice from now on
+    add_to_loaded_index(userId, str(voice["_id"]), name, embedding_from_bytes(voice["embedding"]))
+    updated = await rename_final_speaker(userId, sessionId, speaker, name)
+    return {"message": "Speaker named", "sessionId": sessionId, "name": name, "updatedTranscripts": updated}
+
+
+@router.get("/sessions/{sessionId}/topic-coverage")
+async def get_topic_coverage(
+    sessionId: str,
+    token_data: dict = Depends(verify_token)
+):
+    # Served from the in-memory matcher state; no LLM call involved
+    context = await load_session_context(sessionId, token_data["user_id"])
+    if context.topics is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    return {"sessionId": sessionId, **context.topics.summary()}
+
+
+@router.get("/sessions/{sessionId}/profiles")
+async def get_session_profiles(
+    sessionId: str,
+    token_data: dict = Depends(verify_token)
+):
+    if not is_profiling_admin(token_data["email"]):
+        raise HTTPException(status_code=403, detail="Profiles are only available to admins")
+    return await get_profiles_for_session(sessionId)
+
+
+EXPORT_FIELDS = ["speaker", "start", "end", "text"]
+
+
+@router.get("/sessions/{sessionId}/transcript/export")
+async def export_final_transcript(
+    sessionId: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    speaker: Optional[str] = Query(None),
+    start: Optional[float] = Query(None, ge=0),
+    end: Optional[float] = Query(None, ge=0),
+    token_data: dict = Depends(verify_token)
+):
+    userId = token_data["user_id"]
+    segments = iter_final_segments(sessionId, userId, speaker, start, end)
+
+    async def ndjson_rows():
+        async for segment in segments:
+            yield json.dumps(segment, ensure_ascii=False).encode("utf-8") + b"\n"
+
+    async def csv_rows():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        async for segment in segments:
+            writer.writerow(segment)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode("utf-8")
+
+    if format == "csv":
+        return StreamingResponse(csv_rows(), media_type="text/csv", headers={
+            "Content-Disposition": f'attachment; filename="{sessionId}.csv"'
+        })
+    return StreamingResponse(ndjson_rows(), media_type="application/x-ndjson")
 
 
 @router.post("/meetings", response_model=MeetingResponse)
@@ -287,18 +590,37 @@ async def create_meeting_api(
     token_data: dict = Depends(verify_token)
 ):
     userId = token_data["user_id"]
+    resolve_asr_profile(meeting.asr_profile)
     meeting_data = meeting.dict()
     meeting_data["userId"] = userId
     meeting_id = await create_meeting(meeting_data)
     return MeetingResponse(id=str(meeting_id), **meeting_data)
 
-@router.get("/meetings", response_model=List[MeetingResponse])
+@router.get("/meetings")
 async def get_all_meetings_api(
     userId:str,
+    page: PageParams = Depends(),
     token_data: dict = Depends(verify_token)
 ):
-    docs = await get_all_meetings(userId)
-    return [meeting_doc_to_response(doc) for doc in docs]
+    cursor = find_meetings(userId, page.limit, page.cursor)
+    return stream_page(cursor, lambda doc: meeting_doc_to_response(doc).dict(), page.limit)
+
+@router.put("/meetings/{meeting_id}", response_model=MeetingResponse)
+async def update_meeting_api(
+    meeting_id: str,
+    meeting: MeetingCreate,
+    token_data: dict = Depends(verify_token)
+):
+    userId = token_data["user_id"]
+    if not ObjectId.is_valid(meeting_id):
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    resolve_asr_profile(meeting.asr_profile)
+    meeting_data = meeting.dict()
+    if not await update_meeting(meeting_id, userId, meeting_data):
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    # Live chunks of this session pick up the new description, topics and prompts
+    invalidate_session_context(meeting_id)
+    return MeetingResponse(id=meeting_id, **meeting_data)
 
 @router.get("/meetings/{meeting_id}", response_model=MeetingResponse)
 async def get_meeting_by_id_api(
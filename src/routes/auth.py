@@ -1,8 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from pydantic import BaseModel, EmailStr
-from motor.motor_asyncio import AsyncIOMotorClient
-from src.services.mongo_service import get_user_details, save_user_details, update_user_password
-from src.utils import hash_password, verify_password
+from src.services.mongo_service import get_user_details, save_user_details, update_user_password, update_user_profile
+from src.utils import hash_password_async, verify_password_async, TTLCache
 import os
 from dotenv import load_dotenv
 import jwt
@@ -11,9 +10,14 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 load_dotenv()
 
-client = AsyncIOMotorClient(os.getenv("MONGODB_URI"))
-db = client["sales_ai_assistant"]
-users_collection = db["users"]
+JWT_SECRET = os.getenv("JWT_SECRET", "default_secret")
+JWT_ALGORITHM = "HS256"
+
+# Verified claims keyed by the raw token; an entry never outlives the token's own `exp`
+_token_cache = TTLCache(
+    maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300")),
+)
 
 router = APIRouter()
 
@@ -43,23 +47,33 @@ class UpdateProfileRequest(BaseModel):
 
 security = HTTPBearer()
 
+def decode_token(token: str) -> dict:
+    claims = _token_cache.get(token)
+    if claims is not None:
+        return claims
+
+    payload = jwt.decode(
+        token,
+        JWT_SECRET,
+        algorithms=[JWT_ALGORITHM],
+        options={"verify_exp": True}
+    )
+    email = payload.get("email")
+    user_id = payload.get("user_id")
+    if email is None or user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, 
+            detail="Invalid token payload."
+        )
+    claims = {"email": email, "user_id": user_id}
+    _token_cache.set(token, claims, expires_at=payload.get("exp"))
+    return claims
+
 async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
-        token = credentials.credentials
-        payload = jwt.decode(
-            token, 
-            os.getenv("JWT_SECRET", "default_secret"), 
-            algorithms=["HS256"],
-            options={"verify_exp": True}
-        )
-        email = payload.get("email")
-        user_id = payload.get("user_id")
-        if email is None or user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, 
-                detail="Invalid token payload."
-            )
-        return {"email": email, "user_id": user_id}
+        return decode_token(credentials.credentials)
+    except HTTPException:
+        raise
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, 
@@ -84,7 +98,7 @@ async def signup(data: SignupRequest):
     
     print(f"loggggggg... {data}")
 
-    hashed_pw = hash_password(data.password)
+    hashed_pw = await hash_password_async(data.password)
 
     print(f"hass pasword {hashed_pw}")
     user = await save_user_details({"name": data.name, "email": data.email, "password": hashed_pw})
@@ -94,8 +108,7 @@ async def signup(data: SignupRequest):
         "email": data.email,
         "exp": datetime.utcnow() + timedelta(hours=24)
     }
-    secret = os.getenv("JWT_SECRET", "default_secret")
-    token = jwt.encode(payload, secret, algorithm="HS256")
+    token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
     print(f"tokennnn.... {token}")
 
     return {"message": "Signup successful.", "userId": str(user), "access_token": token}
@@ -105,7 +118,7 @@ async def signup(data: SignupRequest):
 async def login(data: LoginRequest):
     print(f"emilllll  {data}")
     user = await get_user_details({"email": data.email})
-    if not user or not verify_password(data.password, user["password"]):
+    if not user or not await verify_password_async(data.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid email or password.")
     print(f"data  {user["_id"]}")
 
@@ -115,17 +128,16 @@ async def login(data: LoginRequest):
         "email": user["email"],
         "exp": datetime.utcnow() + timedelta(hours=24)
     }
-    secret = os.getenv("JWT_SECRET", "default_secret")
-    token = jwt.encode(payload, secret, algorithm="HS256")
+    token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
     return {"message": "Login successful.", "userId": f"{user["_id"]}", "access_token": token}
 
 @router.post("/change-password")
 async def change_password(data: ChangePasswordRequest, email: str = Depends(verify_token)):
     user = await get_user_details({"email": data.email})
-    if not user or not verify_password(data.old_password, user["password"]):
+    if not user or not await verify_password_async(data.old_password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid email or old password.")
-    new_hashed_pw = hash_password(data.new_password)
+    new_hashed_pw = await hash_password_async(data.new_password)
     updated = await update_user_password(data.email, new_hashed_pw)
     if updated:
         return {"message": "Password changed successfully."}
@@ -148,19 +160,14 @@ async def update_profile(data: UpdateProfileRequest, email: str = Depends(verify
         raise HTTPException(status_code=404, detail="User not found.")
     
     # Update user profile
-    now = datetime.utcnow()
-    result = await users_collection.update_one(
-        {"email": data.email},
-        {"$set": {
-            "name": data.name,
-            "company_name": data.company_name,
-            "mobile_number": data.mobile_number,
-            "position": data.position,
-            "updatedAt": now
-        }}
-    )
-    
-    if result.modified_count:
+    modified = await update_user_profile(data.email, {
+        "name": data.name,
+        "company_name": data.company_name,
+        "mobile_number": data.mobile_number,
+        "position": data.position,
+    })
+
+    if modified:
         return {"message": "Profile updated successfully."}
     else:
         raise HTTPException(status_code=500, detail="Failed to update profile.")
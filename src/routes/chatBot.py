@@ -15,7 +15,7 @@ async def chat_bot(request: ChatBotRequest):
     try:
         instruction = "You are a helpful and friendly assistant. Respond naturally to the user's message."
 
-        reply = run_instruction(instruction, request.message)
+        reply = await run_instruction(instruction, request.message)
 
         return ChatBotResponse(reply=reply)
 
@@ -0,0 +1,42 @@
+import inspect
+import json
+from typing import Callable, Optional
+from bson import ObjectId
+from fastapi import HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="nextCursor from the previous page"),
+    ):
+        if cursor and not ObjectId.is_valid(cursor):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        self.limit = limit
+        self.cursor = cursor
+
+
+def stream_page(cursor, serialize: Callable[[dict], dict], limit: int) -> StreamingResponse:
+    # Writes {"items": [...], "nextCursor": ...} as documents come off the Mongo cursor,
+    # so at most one document is held in memory at a time
+    async def body():
+        count = 0
+        last_id = None
+        yield b'{"items":['
+        async for doc in cursor:
+            last_id = doc["_id"]
+            item = serialize(doc)
+            if inspect.isawaitable(item):
+                item = await item
+            yield (b"," if count else b"") + json.dumps(jsonable_encoder(item)).encode("utf-8")
+            count += 1
+        next_cursor = str(last_id) if count == limit else None
+        yield b'],"nextCursor":' + json.dumps(next_cursor).encode("utf-8") + b"}"
+
+    return StreamingResponse(body(), media_type="application/json")
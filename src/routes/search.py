@@ -0,0 +1,71 @@
+import re
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from src.routes.auth import verify_token
+from src.services.mongo_service import search_transcript_segments, get_meeting_titles
+
+router = APIRouter()
+
+SNIPPET_CHARS = 160
+# The commonest of the words the English text index drops; highlighting them would mark
+# words that played no part in the match
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i if in is it its of on or our she so "
+    "that the their them then there they this to was we were what when which who will with you your".split()
+)
+
+
+def _query_terms(query: str) -> list:
+    # Words the user searched for, minus excluded (-word / -"phrase") ones and stopwords
+    terms = []
+    for token in re.findall(r'-?"[^"]*"|\S+', query):
+        if token.startswith("-"):
+            continue
+        terms.extend(word for word in re.findall(r"\w+", token.lower()) if word not in STOPWORDS)
+    return terms
+
+
+def _highlight_pattern(terms: list):
+    # The text index matches on stems, so highlight any word starting with the term's
+    # leading letters ("pricing" also marks "price"); an approximation, not the stemmer
+    stems = sorted({term[: max(4, len(term) - 3)] for term in terms}, key=len, reverse=True)
+    if not stems:
+        return None
+    return re.compile(r"\b(?:" + "|".join(re.escape(stem) for stem in stems) + r")\w*", re.IGNORECASE)
+
+
+def build_snippet(text: str, pattern) -> dict:
+    """A window of `text` around the first match, with match offsets relative to it."""
+    matches = [(m.start(), m.end()) for m in pattern.finditer(text)] if pattern else []
+    start = max(0, matches[0][0] - SNIPPET_CHARS // 3) if matches else 0
+    end = min(len(text), start + SNIPPET_CHARS)
+    return {
+        "snippet": text[start:end],
+        "snippetOffset": start,
+        "highlights": [[s - start, e - start] for s, e in matches if s >= start and e <= end],
+    }
+
+
+@router.get("/search")
+async def search_transcripts(
+    q: str = Query(..., min_length=1, description='Words to find; "quoted phrase" and -excluded are supported'),
+    sessionId: Optional[str] = Query(None),
+    source: Optional[str] = Query(None, pattern="^(chunk|final|suggestion)$"),
+    limit: int = Query(20, ge=1, le=100),
+    token_data: dict = Depends(verify_token)
+):
+    userId = token_data["user_id"]
+    segments = await search_transcript_segments(userId, q, limit, sessionId, source)
+    titles = await get_meeting_titles(list({segment["sessionId"] for segment in segments}))
+    pattern = _highlight_pattern(_query_terms(q))
+
+    hits = []
+    for segment in segments:
+        text = segment.pop("text", "")
+        hits.append({
+            **segment,
+            "meetingTitle": titles.get(segment["sessionId"]),
+            "score": round(segment["score"], 4),
+            **build_snippet(text, pattern),
+        })
+    return {"query": q, "hits": hits}
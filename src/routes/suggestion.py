@@ -1,7 +1,8 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Body, Query, Depends
 from typing import List
 from bson import ObjectId
-from src.services.mongo_service import get_summary_and_suggestion, save_suggestion, get_suggestions_by_user_and_session
+from src.services.mongo_service import get_summary_and_suggestion, save_suggestion, find_suggestions_by_user_and_session, serialize_suggestion, get_chunk_transcripts, get_suggestion_transcript
+from src.routes.pagination import PageParams, stream_page
 from src.routes.auth import verify_token
 
 router = APIRouter()
@@ -18,14 +19,26 @@ async def create_suggestion(
     return {"message": "Suggestion saved", "id": str(inserted_id)}
 
 
-@router.get("/suggestions", response_model=List[dict])
+@router.get("/suggestions")
 async def get_suggestions(
     sessionId: str = Body(...),
     userId: str = Body(...),
+    include_transcript: bool = Query(False),
+    page: PageParams = Depends(),
     token_data: dict = Depends(verify_token)
 ):
-    suggestions = await get_suggestions_by_user_and_session(userId, sessionId)
-    return suggestions
+    cursor = await find_suggestions_by_user_and_session(userId, sessionId, page.limit, page.cursor, include_transcript)
+    if not include_transcript:
+        return stream_page(cursor, serialize_suggestion, page.limit)
+
+    # Every suggestion of a session slices the same chunk list, so read it once per page
+    chunk_transcripts = await get_chunk_transcripts(sessionId)
+
+    async def with_transcript(doc):
+        doc["transcript"] = await get_suggestion_transcript(doc, chunk_transcripts)
+        return serialize_suggestion(doc)
+
+    return stream_page(cursor, with_transcript, page.limit)
 
 
 @router.get("/meeting-summary/")
@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+import time
+from typing import Optional
+import numpy as np
+from src.services.metrics import ASR_REAL_TIME_FACTOR, model_load
+
+SAMPLE_RATE = 16000
+
+# Named speech-recognition setups. A `beam_size` of None keeps the engine's own decoding
+# (beam search of 5 for faster-whisper, greedy with temperature fallback for openai-whisper).
+# `threads` is the CPU thread count of a faster-whisper engine; openai-whisper uses torch's.
+ASR_PROFILES = {
+    "fast": {"engine": "faster-whisper", "model": "base", "compute_type": "int8", "beam_size": None, "threads": 4},
+    "balanced": {"engine": "faster-whisper", "model": "small", "compute_type": "int8", "beam_size": 5, "threads": 8},
+    "accurate": {"engine": "openai-whisper", "model": "large", "compute_type": "float32", "beam_size": None},
+}
+# JSON object merged over the built-in profiles, e.g. '{"fast": {"model": "tiny"}}'
+for _name, _overrides in json.loads(os.getenv("ASR_PROFILE_OVERRIDES", "{}")).items():
+    ASR_PROFILES[_name] = {**ASR_PROFILES.get(_name, {}), **_overrides}
+
+LIVE_ASR_PROFILE = os.getenv("LIVE_ASR_PROFILE", "fast")
+FINALIZE_ASR_PROFILE = os.getenv("FINALIZE_ASR_PROFILE", "accurate")
+
+
+class AsrEngine:
+    """One loaded ASR profile. Models load on first use and are shared by all callers."""
+
+    def __init__(self, name: str, profile: dict):
+        self.name = name
+        self.profile = profile
+        self._model = None
+        self._batched = None
+        self._lock = threading.Lock()
+        # Running totals behind the measured real-time factor (processing / audio seconds)
+        self.audio_seconds = 0.0
+        self.processing_seconds = 0.0
+
+    @property
+    def supports_batching(self) -> bool:
+        return self.profile["engine"] == "faster-whisper"
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load()
+        return self._model
+
+    @property
+    def batched(self):
+        if self._batched is None:
+            from faster_whisper import BatchedInferencePipeline
+            self._batched = BatchedInferencePipeline(model=self.model)
+        return self._batched
+
+    def _load(self):
+        profile = self.profile
+        with model_load(f"{profile['engine']}-{profile['model']}"):
+            if profile["engine"] == "faster-whisper":
+                from faster_whisper import WhisperModel
+                return WhisperModel(profile["model"], compute_type=profile["compute_type"],
+                                    cpu_threads=profile.get("threads", 0))
+            if profile["engine"] == "openai-whisper":
+                import whisper
+                return whisper.load_model(profile["model"])
+        raise ValueError(f"Unknown ASR engine '{profile['engine']}' in profile '{self.name}'")
+
+    @property
+    def decode_options(self) -> dict:
+        beam_size = self.profile.get("beam_size")
+        return {"beam_size": beam_size} if beam_size else {}
+
+    def detect_languages(self, audios: list) -> list:
+        """Language of each 16 kHz float32 array, from one batched encoder pass over their first 30s."""
+        model = self.model
+        if not model.model.is_multilingual:
+            return ["en"] * len(audios)
+        from faster_whisper.audio import pad_or_trim
+        extractor = model.feature_extractor
+        features = np.stack([pad_or_trim(extractor(audio[:extractor.n_samples])) for audio in audios])
+        results = model.model.detect_language(model.encode(features))
+        # Each result is (token, probability) pairs, most likely first; tokens look like "<|en|>"
+        return [result[0][0][2:-2] for result in results]
+
+    def record(self, audio_seconds: float, processing_seconds: float):
+        self.audio_seconds += audio_seconds
+        self.processing_seconds += processing_seconds
+        if audio_seconds > 0:
+            ASR_REAL_TIME_FACTOR.labels(self.name).observe(processing_seconds / audio_seconds)
+
+    @property
+    def real_time_factor(self) -> Optional[float]:
+        return self.processing_seconds / self.audio_seconds if self.audio_seconds else None
+
+    def transcribe(self, audio) -> str:
+        # `audio` is a file path, file object or 16 kHz float32 array
+        start = time.perf_counter()
+        if self.profile["engine"] == "faster-whisper":
+            segments, info = self.model.transcribe(audio, **self.decode_options)
+            text = " ".join(segment.text.strip() for segment in segments).strip()
+            duration = info.duration
+        else:
+            import whisper
+            if not isinstance(audio, np.ndarray):
+                audio = whisper.load_audio(audio)
+            result = self.model.transcribe(audio, fp16=False, **self.decode_options)
+            text = result.get("text", "").strip()
+            duration = len(audio) / SAMPLE_RATE
+        self.record(duration, time.perf_counter() - start)
+        return text
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            **self.profile,
+            "loaded": self._model is not None,
+            "audio_seconds": round(self.audio_seconds, 3),
+            "real_time_factor": round(self.real_time_factor, 4) if self.real_time_factor is not None else None,
+        }
+
+
+_engines = {name: AsrEngine(name, profile) for name, profile in ASR_PROFILES.items()}
+
+
+def get_engine(profile: Optional[str] = None, default: str = LIVE_ASR_PROFILE) -> AsrEngine:
+    name = profile or default
+    if name not in _engines:
+        raise ValueError(f"Unknown ASR profile '{name}', expected one of {sorted(_engines)}")
+    return _engines[name]
+
+
+def list_profiles() -> list:
+    return [engine.describe() for engine in _engines.values()]
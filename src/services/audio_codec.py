@@ -0,0 +1,116 @@
+import os
+import wave
+import ffmpeg
+
+SAMPLE_RATE = 16000
+
+# Codec for chunks and merged recordings in S3: wav (stored as uploaded) | opus | flac
+AUDIO_STORAGE_CODEC = os.getenv("AUDIO_STORAGE_CODEC", "wav")
+# Opus bitrate; 24k is transparent for 16 kHz mono speech
+OPUS_BITRATE = os.getenv("OPUS_BITRATE", "24k")
+
+# extension, ffmpeg muxer and encoder options per codec. Everything is stored as 16 kHz mono,
+# the rate every model in the pipeline resamples to anyway.
+CODECS = {
+    "opus": (".opus", "ogg", {"acodec": "libopus", "audio_bitrate": OPUS_BITRATE, "application": "voip"}),
+    "flac": (".flac", "flac", {"acodec": "flac", "compression_level": 8}),
+}
+
+if AUDIO_STORAGE_CODEC not in ("wav", *CODECS):
+    raise ValueError(f"Unknown AUDIO_STORAGE_CODEC '{AUDIO_STORAGE_CODEC}', expected wav, {', '.join(CODECS)}")
+
+
+def storage_name(filename: str) -> str:
+    # The name an uploaded file is stored under once encoded for storage
+    if AUDIO_STORAGE_CODEC == "wav":
+        return filename
+    return os.path.splitext(filename)[0] + CODECS[AUDIO_STORAGE_CODEC][0]
+
+
+def encode_for_storage(audio_bytes: bytes) -> bytes:
+    """Transcodes an uploaded audio file to the storage codec; wav storage keeps it as is."""
+    if AUDIO_STORAGE_CODEC == "wav":
+        return audio_bytes
+    _, muxer, options = CODECS[AUDIO_STORAGE_CODEC]
+    out, _ = (
+        ffmpeg.input("pipe:0")
+        .output("pipe:1", format=muxer, ac=1, ar=SAMPLE_RATE, **options)
+        .run(input=audio_bytes, capture_stdout=True, capture_stderr=True)
+    )
+    return out
+
+
+def encode_file_for_storage(path: str) -> bytes:
+    if AUDIO_STORAGE_CODEC == "wav":
+        with open(path, "rb") as f:
+            return f.read()
+    _, muxer, options = CODECS[AUDIO_STORAGE_CODEC]
+    out, _ = (
+        ffmpeg.input(path)
+        .output("pipe:1", format=muxer, ac=1, ar=SAMPLE_RATE, **options)
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    return out
+
+
+# ffmpeg raw format and codec per PCM sample width in bytes
+PCM_FORMATS = {1: ("u8", "pcm_u8"), 2: ("s16le", "pcm_s16le"), 3: ("s24le", "pcm_s24le"), 4: ("s32le", "pcm_s32le")}
+
+
+def pcm_format(path: str) -> tuple:
+    """(channels, sample width, sample rate) the file decodes to."""
+    try:
+        with wave.open(path, "rb") as pcm:
+            return pcm.getnchannels(), pcm.getsampwidth(), pcm.getframerate()
+    except (wave.Error, EOFError):
+        pass
+    # Compressed audio decodes to 16-bit samples
+    stream = next(s for s in ffmpeg.probe(path)["streams"] if s["codec_type"] == "audio")
+    return int(stream["channels"]), 2, int(stream["sample_rate"])
+
+
+def _open_pcm_wav(path: str, params: tuple):
+    try:
+        pcm = wave.open(path, "rb")
+    except (wave.Error, EOFError):
+        return None
+    if (pcm.getnchannels(), pcm.getsampwidth(), pcm.getframerate()) != params:
+        pcm.close()
+        return None
+    return pcm
+
+
+def stream_pcm(path: str, block_size: int = 1 << 16, channels: int = 1, sample_width: int = 2,
+               rate: int = SAMPLE_RATE):
+    """Decodes any stored chunk (wav, opus, flac) to interleaved little-endian PCM, block by block.
+
+    Defaults to 16 kHz mono 16-bit.
+    """
+    pcm = _open_pcm_wav(path, (channels, sample_width, rate))
+    if pcm is not None:
+        # Already in the target format: copy the frames without starting ffmpeg
+        with pcm:
+            while True:
+                block = pcm.readframes(block_size // (channels * sample_width))
+                if not block:
+                    return
+                yield block
+
+    raw_format, codec = PCM_FORMATS[sample_width]
+    process = (
+        ffmpeg.input(path)
+        .output("pipe:1", format=raw_format, acodec=codec, ac=channels, ar=rate)
+        .run_async(pipe_stdout=True, pipe_stderr=True)
+    )
+    try:
+        while True:
+            block = process.stdout.read(block_size)
+            if not block:
+                break
+            yield block
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed to decode {path}: {stderr.decode(errors='ignore')[-500:]}")
@@ -1,7 +1,22 @@
-from pydub import AudioSegment
+import wave
+from src.services.audio_codec import AUDIO_STORAGE_CODEC, SAMPLE_RATE, pcm_format, stream_pcm
+
 
 def merge_audio_chunks(file_paths: list, output_path: str):
-    combined = AudioSegment.empty()
-    for path in file_paths:
-        combined += AudioSegment.from_file(path)
-    combined.export(output_path, format="wav")
+    # Chunks are decoded one at a time straight into the output, so memory stays flat
+    # however long the meeting is and stored chunks may be in any codec
+    if AUDIO_STORAGE_CODEC == "wav":
+        # Chunks are stored as uploaded; keep the best channel count, sample width and
+        # rate among them, as mixed chunks were merged before
+        formats = [pcm_format(path) for path in file_paths] or [(1, 2, SAMPLE_RATE)]
+        channels, sample_width, rate = (max(values) for values in zip(*formats))
+    else:
+        # Compressed storage keeps chunks as 16 kHz mono already
+        channels, sample_width, rate = 1, 2, SAMPLE_RATE
+    with wave.open(output_path, "wb") as out:
+        out.setnchannels(channels)
+        out.setsampwidth(sample_width)
+        out.setframerate(rate)
+        for path in file_paths:
+            for block in stream_pcm(path, channels=channels, sample_width=sample_width, rate=rate):
+                out.writeframes(block)
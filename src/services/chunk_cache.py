@@ -0,0 +1,121 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from typing import Optional
+from src.services.metrics import CHUNK_CACHE_REQUESTS, CHUNK_CACHE_SAVED_BYTES
+
+# Where this node keeps copies of recently uploaded chunks, in their stored (encoded) form
+CHUNK_CACHE_DIR = os.getenv("CHUNK_CACHE_DIR", os.path.join(tempfile.gettempdir(), "chunk-cache"))
+# 0 turns the cache off
+CHUNK_CACHE_MAX_BYTES = int(os.getenv("CHUNK_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+CHUNK_CACHE_MAX_AGE_SECONDS = float(os.getenv("CHUNK_CACHE_MAX_AGE_SECONDS", "21600"))
+# How often a writer re-measures the directory, which also counts the other workers' writes
+CHUNK_CACHE_PRUNE_INTERVAL_SECONDS = float(os.getenv("CHUNK_CACHE_PRUNE_INTERVAL_SECONDS", "10"))
+
+
+class ChunkCache:
+    """Bounded on-disk cache of chunk audio, keyed by chunk name.
+
+    Entries older than `max_age` are ignored and removed; past `max_bytes` the least
+    recently used go first. Everything lives in the directory (mtime marks last use), so
+    all workers on a node share one cache and it survives restarts.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_age: float,
+                 prune_interval: float = CHUNK_CACHE_PRUNE_INTERVAL_SECONDS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.prune_interval = prune_interval
+        # Directory size at the last prune plus what this process wrote since
+        self._bytes = 0
+        self._measured_at = None
+        if self.enabled:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, chunk_name: str) -> str:
+        # Hashed, so a chunk name can't escape the directory
+        return os.path.join(self.directory, hashlib.sha256(chunk_name.encode("utf-8")).hexdigest())
+
+    def put(self, chunk_name: str, data: bytes):
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+        path = self._path(chunk_name)
+        # Written under a temporary name, so a concurrent reader never sees a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[WARN] Could not cache chunk {chunk_name}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._bytes += len(data)
+        # Other workers on the node write here too, so the directory is re-measured regularly
+        # and not only when this process's own count crosses the limit
+        stale = self._measured_at is None or time.monotonic() - self._measured_at >= self.prune_interval
+        if stale or self._bytes > self.max_bytes:
+            self.prune()
+
+    def copy_to(self, chunk_name: str, dest: str) -> bool:
+        """Places the cached chunk at `dest`; False when it isn't cached (or has expired)."""
+        if not self.enabled:
+            return False
+        path = self._path(chunk_name)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                os.remove(path)
+                raise FileNotFoundError(path)
+            # A hard link costs no copy, and keeps the data even if the entry is evicted meanwhile
+            try:
+                os.link(path, dest)
+            except OSError:
+                shutil.copyfile(path, dest)
+            os.utime(path)
+        except FileNotFoundError:
+            CHUNK_CACHE_REQUESTS.labels("miss").inc()
+            return False
+        CHUNK_CACHE_REQUESTS.labels("hit").inc()
+        CHUNK_CACHE_SAVED_BYTES.inc(os.path.getsize(dest))
+        return True
+
+    def prune(self):
+        now = time.time()
+        entries = []
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            # Leftovers of writes that died halfway are removed with the expired entries
+            if now - stat.st_mtime > self.max_age:
+                self._remove(entry.path)
+            elif not entry.name.endswith(".part"):
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+        self._bytes = total
+        self._measured_at = time.monotonic()
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+chunk_cache = ChunkCache(CHUNK_CACHE_DIR, CHUNK_CACHE_MAX_BYTES, CHUNK_CACHE_MAX_AGE_SECONDS)
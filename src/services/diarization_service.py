@@ -1,8 +1,10 @@
 from pyannote.audio import Pipeline
 from src.config import HUGGINGFACE_TOKEN
+from src.services.metrics import model_load
 
-pipeline = Pipeline.from_pretrained( "pyannote/speaker-diarization-3.1",
-                                    use_auth_token=HUGGINGFACE_TOKEN)
+with model_load("pyannote-diarization"):
+    pipeline = Pipeline.from_pretrained( "pyannote/speaker-diarization-3.1",
+                                        use_auth_token=HUGGINGFACE_TOKEN)
 
 # def diarize_audio(file_path: str) -> list:
 #     diarization = pipeline(file_path)
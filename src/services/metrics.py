@@ -0,0 +1,94 @@
+import functools
+import time
+from contextlib import contextmanager
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Stages range from a few ms (Mongo) to many minutes (finalize of a long meeting)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+IO_BUCKETS = (0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+PIPELINE_STAGE_SECONDS = Histogram(
+    "pipeline_stage_seconds", "Wall time of each audio/LLM pipeline stage", ["stage"], buckets=STAGE_BUCKETS
+)
+S3_REQUEST_SECONDS = Histogram(
+    "s3_request_seconds", "Latency of S3 calls", ["operation"], buckets=IO_BUCKETS
+)
+S3_BYTES = Counter("s3_bytes_total", "Bytes moved to and from S3", ["operation"])
+MONGO_REQUEST_SECONDS = Histogram(
+    "mongo_request_seconds", "Latency of Mongo service calls", ["operation"], buckets=IO_BUCKETS
+)
+MONGO_WRITE_BEHIND_DOCS = Counter(
+    "mongo_write_behind_docs_total", "Documents written through the write-behind buffer", ["collection", "outcome"]
+)
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens processed", ["kind"])
+LLM_COMPLETION_TOKENS_PER_SECOND = Histogram(
+    "llm_completion_tokens_per_second", "LLM generation throughput per call",
+    buckets=(1, 2, 4, 6, 8, 12, 16, 24, 32, 48, 64, 128)
+)
+LLM_CACHE_REQUESTS = Counter(
+    "llm_cache_requests_total", "LLM response cache lookups by result", ["result"]
+)
+CHUNK_CACHE_REQUESTS = Counter(
+    "chunk_cache_requests_total", "Node-local chunk audio cache lookups by result", ["result"]
+)
+CHUNK_CACHE_SAVED_BYTES = Counter(
+    "chunk_cache_saved_bytes_total", "Chunk audio read from the node-local cache instead of S3"
+)
+BACKGROUND_TASKS_IN_FLIGHT = Gauge(
+    "background_tasks_in_flight", "Background tasks started and not yet finished", ["task"]
+)
+BACKGROUND_TASKS = Counter(
+    "background_tasks_total", "Background tasks by class and outcome", ["task", "outcome"]
+)
+BACKGROUND_TASK_SECONDS = Histogram(
+    "background_task_seconds", "Run time of background tasks", ["task"], buckets=STAGE_BUCKETS
+)
+QUEUE_DEPTH = Gauge("queue_depth", "Items waiting in in-process queues", ["queue"])
+ASR_REAL_TIME_FACTOR = Histogram(
+    "asr_real_time_factor", "ASR processing seconds per second of audio", ["profile"],
+    buckets=(0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 4)
+)
+MODEL_LOAD_SECONDS = Gauge("model_load_seconds", "Time taken to load each model", ["model"])
+
+
+@contextmanager
+def stage(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PIPELINE_STAGE_SECONDS.labels(name).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def model_load(name: str):
+    start = time.perf_counter()
+    yield
+    MODEL_LOAD_SECONDS.labels(name).set(time.perf_counter() - start)
+
+
+def timed_mongo(fn):
+    histogram = MONGO_REQUEST_SECONDS.labels(fn.__name__)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+def record_llm_usage(usage: dict, seconds: float):
+    prompt_tokens = usage.get("prompt_tokens", 0)
+    completion_tokens = usage.get("completion_tokens", 0)
+    LLM_TOKENS.labels("prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels("completion").inc(completion_tokens)
+    if seconds > 0 and completion_tokens:
+        LLM_COMPLETION_TOKENS_PER_SECOND.observe(completion_tokens / seconds)
+
+
+def render_metrics():
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,25 +1,231 @@
+import asyncio
+import os
 from typing import Optional
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
 from src.config import MONGO_URL, MONGO_DB_NAME
-from datetime import datetime
-from pymongo import DESCENDING
-
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[MONGO_DB_NAME]
-
-chunks_col = db["chunks"]
-final_col = db["finalTranscriptions"]
-sales_col = db["salesSamples"]
-chunks_col_Transcription = db["transcriptionChunks"]
-users_collection = db["users"]
-meetings_collection = db["meetings"]
-prediction_collection = db["predictions"]
-suggestion_collection = db["suggestions"]
-meeting_summry_collection = db["meetingSummrys"]
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, DESCENDING, TEXT, ReturnDocument
+from src.services.metrics import timed_mongo, MONGO_REQUEST_SECONDS, MONGO_WRITE_BEHIND_DOCS, QUEUE_DEPTH
+
+# Connection pool of the one client the whole app shares
+MONGO_POOL_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+    "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+    "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000")),
+    "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000")),
+}
+# Buffer inserts nothing reads back right away and write them in batches
+MONGO_WRITE_BEHIND = os.getenv("MONGO_WRITE_BEHIND", "0") == "1"
+MONGO_WRITE_BEHIND_MAX_BATCH = int(os.getenv("MONGO_WRITE_BEHIND_MAX_BATCH", "500"))
+MONGO_WRITE_BEHIND_FLUSH_MS = int(os.getenv("MONGO_WRITE_BEHIND_FLUSH_MS", "200"))
+
+client = None
+db = None
+
+def use_database(database):
+    # Rebinds every collection handle, e.g. to point the service at a local stand-in
+    global db, chunks_col, final_col, sales_col, chunks_col_Transcription, users_collection
+    global meetings_collection, prediction_collection, suggestion_collection, meeting_summry_collection
+    global profiles_collection, speaker_voices_collection, transcript_segments_collection, pending_tasks_collection
+    global llm_responses_collection, presigned_uploads_collection
+    db = database
+    chunks_col = db["chunks"]
+    final_col = db["finalTranscriptions"]
+    sales_col = db["salesSamples"]
+    chunks_col_Transcription = db["transcriptionChunks"]
+    users_collection = db["users"]
+    meetings_collection = db["meetings"]
+    prediction_collection = db["predictions"]
+    suggestion_collection = db["suggestions"]
+    meeting_summry_collection = db["meetingSummrys"]
+    profiles_collection = db["profiles"]
+    speaker_voices_collection = db["speakerVoices"]
+    transcript_segments_collection = db["transcriptSegments"]
+    pending_tasks_collection = db["pendingTasks"]
+    llm_responses_collection = db["llmResponses"]
+    presigned_uploads_collection = db["presignedUploads"]
+
+
+class _NotConnected:
+    # Stands in for the database until connect(), so early use fails with a clear message
+    def __getitem__(self, name):
+        return self
+
+    def __getattr__(self, name):
+        raise RuntimeError(
+            "mongo_service is not connected: the app lifespan calls connect(); scripts and tests "
+            "must call connect() or use_database() before using the service"
+        )
+
+
+use_database(_NotConnected())
+
+
+def connect():
+    """Creates the app's shared client. Called from the app lifespan.
+
+    Code running outside the app (scripts, tests) must call this, or `use_database()`,
+    itself. A client installed beforehand (e.g. a test stand-in) is kept.
+    """
+    global client
+    if client is None:
+        client = AsyncIOMotorClient(MONGO_URL, **MONGO_POOL_OPTIONS)
+        use_database(client[MONGO_DB_NAME])
+
+
+async def close():
+    global client
+    await write_behind.close()
+    if client is not None:
+        client.close()
+        client = None
+
+
+class WriteBehindBuffer:
+    """Collects inserts per collection and writes them with insert_many.
+
+    A batch goes out every MONGO_WRITE_BEHIND_FLUSH_MS, or sooner once
+    MONGO_WRITE_BEHIND_MAX_BATCH documents are waiting. Readers of a buffered collection
+    call `flush(collection)` first, so they always see their own writes.
+    """
+
+    def __init__(self, max_batch: int, flush_interval: float):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._size = 0
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task = None
+        self._closing = False
+        QUEUE_DEPTH.labels("mongo_write_behind").set_function(lambda: self._size)
+
+    def add(self, collection, docs: list):
+        self._pending.setdefault(collection.full_name, (collection, []))[1].extend(docs)
+        self._size += len(docs)
+        if not self._closing and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+        if self._size >= self.max_batch:
+            self._wake.set()
+
+    async def _run(self):
+        while self._pending and not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def close(self):
+        # The loop is stopped rather than cancelled, so a batch it's writing isn't lost halfway
+        self._closing = True
+        self._wake.set()
+        try:
+            if self._task is not None:
+                await self._task
+                self._task = None
+            await self.flush()
+        finally:
+            self._closing = False
+            self._wake.clear()
+
+    async def flush(self, collection=None):
+        # Holding the lock means a reader also waits for a batch that is already being written
+        async with self._lock:
+            names = [collection.full_name] if collection is not None else list(self._pending)
+            for name in names:
+                target, docs = self._pending.pop(name, (None, []))
+                if not docs:
+                    continue
+                self._size -= len(docs)
+                try:
+                    with MONGO_REQUEST_SECONDS.labels("write_behind_flush").time():
+                        await target.insert_many(docs, ordered=False)
+                    MONGO_WRITE_BEHIND_DOCS.labels(target.name, "flushed").inc(len(docs))
+                except Exception as e:
+                    MONGO_WRITE_BEHIND_DOCS.labels(target.name, "failed").inc(len(docs))
+                    print(f"[ERROR] Write-behind insert of {len(docs)} docs into {name} failed: {e}")
+
+
+write_behind = WriteBehindBuffer(MONGO_WRITE_BEHIND_MAX_BATCH, MONGO_WRITE_BEHIND_FLUSH_MS / 1000)
+
+
+async def _insert(collection, docs: list, buffered: bool = True) -> list:
+    # Ids are assigned here so buffered inserts can return them before they're written
+    for doc in docs:
+        doc.setdefault("_id", ObjectId())
+    if buffered and MONGO_WRITE_BEHIND:
+        write_behind.add(collection, docs)
+    elif len(docs) == 1:
+        await collection.insert_one(docs[0])
+    elif docs:
+        await collection.insert_many(docs, ordered=False)
+    return [doc["_id"] for doc in docs]
+
+
+async def _flush_pending(collection):
+    if MONGO_WRITE_BEHIND:
+        await write_behind.flush(collection)
+
+# Transcript bodies are the bulk of a suggestion document; list endpoints leave them out by default
+SUGGESTION_LIST_PROJECTION = {"transcript": 0}
+SEGMENT_SEARCH_PROJECTION = {"_id": 0, "sessionId": 1, "source": 1, "speaker": 1, "start": 1, "end": 1,
+                             "seq": 1, "text": 1, "createdAt": 1, "score": {"$meta": "textScore"}}
+
+
+async def ensure_indexes():
+    # Keyset pagination walks these in `_id` order per owner
+    await meetings_collection.create_index([("userId", ASCENDING), ("_id", DESCENDING)])
+    await suggestion_collection.create_index([("userId", ASCENDING), ("sessionId", ASCENDING), ("_id", DESCENDING)])
+    await final_col.create_index([("sessionId", ASCENDING), ("userId", ASCENDING), ("createdAt", DESCENDING)])
+    await meeting_summry_collection.create_index("sessionId")
+    await profiles_collection.create_index([("sessionId", ASCENDING), ("createdAt", DESCENDING)])
+    await speaker_voices_collection.create_index([("userId", ASCENDING), ("name", ASCENDING)])
+    await speaker_voices_collection.create_index([("userId", ASCENDING), ("sessionId", ASCENDING), ("label", ASCENDING)])
+    await speaker_voices_collection.create_index([("userId", ASCENDING), ("updatedAt", DESCENDING)])
+    # userId is an equality prefix of the text index, so a search only reads that user's postings
+    await transcript_segments_collection.create_index(
+        [("userId", ASCENDING), ("text", TEXT)], name="userId_text", default_language="english"
+    )
+    await transcript_segments_collection.create_index([("sessionId", ASCENDING), ("source", ASCENDING)])
+    await prediction_collection.create_index([("userId", ASCENDING), ("sessionId", ASCENDING), ("question", ASCENDING)])
+    await pending_tasks_collection.create_index([("name", ASCENDING), ("createdAt", ASCENDING)])
+    await llm_responses_collection.create_index("key", unique=True)
+    await presigned_uploads_collection.create_index("key", unique=True)
+    await presigned_uploads_collection.create_index("expiresAt", expireAfterSeconds=0)
+    # Cached LLM responses are removed by Mongo once expiresAt has passed
+    await llm_responses_collection.create_index("expiresAt", expireAfterSeconds=0)
+
+
+async def _index_segments(userId: str, sessionId: str, source: str, segments: list):
+    # transcriptSegments holds one searchable document per chunk transcript, diarized
+    # segment or suggestion, written alongside the document it comes from
+    now = datetime.utcnow()
+    docs = [
+        {**segment, "userId": userId, "sessionId": sessionId, "source": source, "createdAt": now}
+        for segment in segments if (segment.get("text") or "").strip()
+    ]
+    await _insert(transcript_segments_collection, docs)
+
+
+def _keyset_query(query: dict, after: Optional[str]) -> dict:
+    # Pages run newest first, so the next page starts strictly below the last `_id` seen
+    if after:
+        query["_id"] = {"$lt": ObjectId(after)}
+    return query
 
 # Save chunk metadata
-async def save_chunk_metadata(session_id: str, chunk_name: str, userId: str, transcript: str, s3_url: str):
+@timed_mongo
+async def save_chunk_metadata(session_id: str, chunk_name: str, userId: str, transcript: str, s3_url: str,
+                              content_hash: Optional[str] = None, seq: Optional[int] = None) -> bool:
+    # Returns False when a chunk with the same content hash and client seq was already recorded.
+    # Without a seq there's nothing to tell a retry from a repeat (silence is byte-identical),
+    # so the chunk is always appended.
     now = datetime.utcnow()
     doc = {
         "sessionId": session_id,
@@ -30,24 +236,95 @@ async def save_chunk_metadata(session_id: str, chunk_name: str, userId: str, tra
         "updatedAt": now,
         "userId": userId,
         "chunk_name": chunk_name,
+        "contentHash": content_hash,
+        "seq": seq,
     }
-    await chunks_col.update_one(
-        {"sessionId": session_id, "userId": userId},
+    query = {"sessionId": session_id, "userId": userId}
+    upsert = True
+    if content_hash is not None and seq is not None:
+        # Create the session document first so the push below can be guarded without upserting
+        await chunks_col.update_one(query, {"$setOnInsert": {"createdAt": now, "chunks": []}}, upsert=True)
+        query["chunks"] = {"$not": {"$elemMatch": {"contentHash": content_hash, "seq": seq}}}
+        upsert = False
+    result = await chunks_col.update_one(
+        query,
         {
             "$push": {"chunks": doc},
             "$set": {"updatedAt": now},
             "$setOnInsert": {"createdAt": now}
         },
-        upsert=True
+        upsert=upsert
+    )
+    added = result.modified_count > 0 or result.upserted_id is not None
+    if added:
+        await _index_segments(userId, session_id, "chunk", [{"text": transcript, "seq": seq, "chunkName": chunk_name}])
+    return added
+
+@timed_mongo
+async def find_chunk(session_id: str, userId: str, content_hash: str, seq: int):
+    doc = await chunks_col.find_one(
+        {"sessionId": session_id, "userId": userId,
+         "chunks": {"$elemMatch": {"contentHash": content_hash, "seq": seq}}},
+        {"chunks.$": 1},
+    )
+    return doc["chunks"][0] if doc else None
+
+@timed_mongo
+async def save_presigned_upload(key: str, session_id: str, userId: str, seq: Optional[int], expires_at: datetime):
+    await presigned_uploads_collection.insert_one({
+        "key": key,
+        "sessionId": session_id,
+        "userId": userId,
+        "seq": seq,
+        "status": "pending",
+        "expiresAt": expires_at,
+        "createdAt": datetime.utcnow(),
+    })
+
+@timed_mongo
+async def get_presigned_upload(key: str, session_id: str, userId: str) -> Optional[dict]:
+    return await presigned_uploads_collection.find_one(
+        {"key": key, "sessionId": session_id, "userId": userId, "expiresAt": {"$gt": datetime.utcnow()}}
     )
 
+@timed_mongo
+async def claim_presigned_upload(key: str, session_id: str, userId: str, lease_seconds: float) -> Optional[dict]:
+    # Moves the upload from pending to ingesting, so only one request ingests a key. A claim
+    # older than the lease belonged to a worker that died mid-ingest and may be taken over.
+    now = datetime.utcnow()
+    return await presigned_uploads_collection.find_one_and_update(
+        {
+            "key": key, "sessionId": session_id, "userId": userId, "expiresAt": {"$gt": now},
+            "$or": [
+                {"status": "pending"},
+                {"status": "ingesting", "claimedAt": {"$lt": now - timedelta(seconds=lease_seconds)}},
+            ],
+        },
+        {"$set": {"status": "ingesting", "claimedAt": now}},
+        return_document=ReturnDocument.AFTER,
+    )
+
+@timed_mongo
+async def release_presigned_upload(key: str):
+    # The ingest failed; a retry may claim the key again
+    await presigned_uploads_collection.update_one(
+        {"key": key, "status": "ingesting"}, {"$set": {"status": "pending"}, "$unset": {"claimedAt": ""}}
+    )
+
+@timed_mongo
+async def complete_presigned_upload(key: str, result: dict):
+    # Kept until it expires, so a retried ingest gets the same result back
+    await presigned_uploads_collection.update_one({"key": key}, {"$set": {"status": "done", "result": result}})
+
 # Get chunk list
+@timed_mongo
 async def get_chunk_list(session_id: str):
     doc = await chunks_col.find_one({"sessionId": session_id})
     print(f"chunksss {doc}")
     return doc["chunks"] if doc else []
 
 # Save final audio
+@timed_mongo
 async def save_final_audio(session_id: str, s3_url: str, results: list, userId: str):
     now = datetime.utcnow()
     doc = {
@@ -59,9 +336,42 @@ async def save_final_audio(session_id: str, s3_url: str, results: list, userId:
         "updatedAt": now
     }
     result = await final_col.insert_one(doc)
+    # Only the latest finalization of a session is searchable
+    await _flush_pending(transcript_segments_collection)
+    await transcript_segments_collection.delete_many({"sessionId": session_id, "userId": userId, "source": "final"})
+    await _index_segments(userId, session_id, "final", [
+        {"speaker": r.get("speaker"), "start": r.get("start"), "end": r.get("end"), "text": r.get("text"),
+         "finalId": result.inserted_id}
+        for r in results
+    ])
     return result.inserted_id
 
+# Stream the diarized segments of a session's latest finalization one by one.
+# Filtering happens in the aggregation so only matching segments cross the wire.
+def iter_final_segments(session_id: str, userId: str, speaker: Optional[str] = None,
+                        start: Optional[float] = None, end: Optional[float] = None):
+    pipeline = [
+        {"$match": {"sessionId": session_id, "userId": userId}},
+        {"$sort": {"createdAt": DESCENDING}},
+        {"$limit": 1},
+        {"$unwind": "$results"},
+        {"$replaceRoot": {"newRoot": "$results"}},
+    ]
+    segment_match = {}
+    if speaker:
+        segment_match["speaker"] = speaker
+    # Keep every segment that overlaps [start, end)
+    if start is not None:
+        segment_match["end"] = {"$gt": start}
+    if end is not None:
+        segment_match["start"] = {"$lt": end}
+    if segment_match:
+        pipeline.append({"$match": segment_match})
+    pipeline.append({"$project": {"_id": 0, "speaker": 1, "start": 1, "end": 1, "text": 1}})
+    return final_col.aggregate(pipeline, batchSize=500)
+
 # Save salesperson sample
+@timed_mongo
 async def save_salesperson_sample(filename: str, s3_url: str, userId: str):
     now = datetime.utcnow()
     doc = {
@@ -76,12 +386,14 @@ async def save_salesperson_sample(filename: str, s3_url: str, userId: str):
     return result.inserted_id
 
 # Get salesperson sample
+@timed_mongo
 async def get_salesperson_sample(userId: str):
     result = await sales_col.find_one({"userId": userId})
     print(f"data.. {result}")
     return result
 
 # Save transcription chunk
+@timed_mongo
 async def save_transcription_chunk(sessionId: str, s3_url: str, transcript: str, userId: str):
     now = datetime.utcnow()
     doc = {
@@ -93,10 +405,11 @@ async def save_transcription_chunk(sessionId: str, s3_url: str, transcript: str,
         "updatedAt": now,
         "userId": userId
     }
-    result = await chunks_col_Transcription.insert_one(doc)
-    return result.inserted_id
+    (inserted_id,) = await _insert(chunks_col_Transcription, [doc])
+    return inserted_id
 
 # Save user details
+@timed_mongo
 async def save_user_details(data: object):
     print(f"dataaaaaaa  {data}")
     print(f"password {data['password']}")
@@ -114,12 +427,14 @@ async def save_user_details(data: object):
     return inserted_user
 
 # Get user details
+@timed_mongo
 async def get_user_details(data: object):
     result = await users_collection.find_one({"email": data["email"]})
     print(f"data.. {result}")
     return result
 
 
+@timed_mongo
 async def create_meeting(data: dict):
     print(f"dataaaaaaa  {data}")
     data["createdAt"] = datetime.utcnow()
@@ -127,17 +442,35 @@ async def create_meeting(data: dict):
     result = await meetings_collection.insert_one(data)
     return result.inserted_id
 
-async def get_all_meetings(userId:str):
-    cursor = meetings_collection.find({"userId":userId})
-    return await cursor.to_list(length=None)
+def find_meetings(userId: str, limit: int, after: Optional[str] = None):
+    query = _keyset_query({"userId": userId}, after)
+    return meetings_collection.find(query).sort("_id", DESCENDING).limit(limit)
 
+@timed_mongo
+async def update_meeting(meeting_id: str, userId: str, data: dict) -> bool:
+    result = await meetings_collection.update_one(
+        {"_id": ObjectId(meeting_id), "userId": userId},
+        {"$set": {**data, "updatedAt": datetime.utcnow()}},
+    )
+    return result.matched_count > 0
+
+@timed_mongo
 async def get_meeting_by_id(meeting_id: str):
     doc = await meetings_collection.find_one({"_id": ObjectId(meeting_id)})
     return doc
 
-async def save_prediction_result(userId: str, sessionId: str, question: str, topic: str, result: str):
+@timed_mongo
+async def get_meeting_updated_at(meeting_id: str):
+    # Just the version of the meeting, to tell whether a cached copy is still current
+    doc = await meetings_collection.find_one({"_id": ObjectId(meeting_id)}, {"_id": 0, "updatedAt": 1})
+    return doc.get("updatedAt") if doc else None
+
+@timed_mongo
+async def save_prediction_result(userId: str, sessionId: str, question: str, topic: str, result: str,
+                                 details: Optional[dict] = None):
     now = datetime.utcnow()
     doc = {
+        **(details or {}),
         "userId": userId,
         "sessionId": sessionId,
         "question": question,
@@ -146,27 +479,66 @@ async def save_prediction_result(userId: str, sessionId: str, question: str, top
         "createdAt": now,
         "updatedAt": now
     }
-    res = await prediction_collection.insert_one(doc)
-    return res.inserted_id
+    (inserted_id,) = await _insert(prediction_collection, [doc])
+    return inserted_id
 
+@timed_mongo
 async def   get_predictions(userId: str, sessionId: str = None):
     now = datetime.utcnow()
     query = {"userId": userId}
     if sessionId:
         query["sessionId"] = sessionId
+    await _flush_pending(prediction_collection)
     cursor = prediction_collection.find(query)
     return await cursor.to_list(length=100)
 
-async def save_suggestion(sessionId: str, userId: str, transcript: str, suggestion: str):
+@timed_mongo
+async def get_topic_coverage(userId: str, sessionId: str, question: str) -> list:
+    await _flush_pending(prediction_collection)
+    cursor = prediction_collection.find(
+        {"userId": userId, "sessionId": sessionId, "question": question},
+        {"_id": 0, "topic": 1, "phrase": 1, "seq": 1},
+    ).sort("createdAt", ASCENDING)
+    return await cursor.to_list(length=None)
+
+@timed_mongo
+async def save_suggestion(sessionId: str, userId: str, transcript: Optional[str], suggestion: str,
+                          chunk_range: Optional[tuple] = None):
+    # Live suggestions reference the half-open range of session chunks they were generated
+    # from instead of carrying a copy of the transcript; see build_transcript()
     doc = {
         "sessionId": sessionId,
         "userId": userId,
-        "transcript": transcript,
         "suggestion": suggestion,
         "createdAt": datetime.utcnow()
     }
-    result = await suggestion_collection.insert_one(doc)
-    return result.inserted_id
+    if transcript is not None:
+        doc["transcript"] = transcript
+    if chunk_range is not None:
+        doc["chunkStart"], doc["chunkEnd"] = chunk_range
+    (inserted_id,) = await _insert(suggestion_collection, [doc])
+    await _index_segments(userId, sessionId, "suggestion", [{"text": suggestion, "suggestionId": inserted_id}])
+    return inserted_id
+
+
+@timed_mongo
+async def get_chunk_transcripts(session_id: str) -> list:
+    doc = await chunks_col.find_one({"sessionId": session_id}, {"chunks.transcript": 1})
+    return [chunk.get("transcript") for chunk in doc["chunks"]] if doc else []
+
+
+def build_transcript(chunk_transcripts: list, start: int = 0, end: Optional[int] = None) -> str:
+    return "\n".join(t for t in chunk_transcripts[start:end] if t is not None)
+
+
+async def get_suggestion_transcript(suggestion: dict, chunk_transcripts: Optional[list] = None) -> str:
+    if "transcript" in suggestion:
+        return suggestion["transcript"]
+    if "chunkEnd" not in suggestion:
+        return ""
+    if chunk_transcripts is None:
+        chunk_transcripts = await get_chunk_transcripts(suggestion["sessionId"])
+    return build_transcript(chunk_transcripts, suggestion["chunkStart"], suggestion["chunkEnd"])
 
 
 
@@ -174,39 +546,188 @@ def serialize_suggestion(suggestion: dict) -> dict:
     suggestion["_id"] = str(suggestion["_id"])  # Convert ObjectId to string
     return suggestion
 
-async def get_suggestions_by_user_and_session(userId: str, sessionId: str):
-    query = {"userId": userId, "sessionId": sessionId}
-    cursor = suggestion_collection.find(query)
-    results = await cursor.to_list(length=None)
-    return [serialize_suggestion(s) for s in results]
+async def find_suggestions_by_user_and_session(userId: str, sessionId: str, limit: int,
+                                               after: Optional[str] = None, include_transcript: bool = False):
+    await _flush_pending(suggestion_collection)
+    query = _keyset_query({"userId": userId, "sessionId": sessionId}, after)
+    # Without transcripts the chunk range fields are enough for a client to ask for one later
+    projection = None if include_transcript else SUGGESTION_LIST_PROJECTION
+    return suggestion_collection.find(query, projection).sort("_id", DESCENDING).limit(limit)
 
 
 
+@timed_mongo
 async def update_final_summary_and_suggestion(sessionId: str, userId: str, summary: str, suggestion:str):
+    # One summary per session: a replayed or repeated finalize overwrites it
     now = datetime.utcnow()
-    doc = {
-        "userId": userId,
-        "sessionId": sessionId,
-        "summary": summary,
-        "suggestion":suggestion,
-        "createdAt": now,
-        "updatedAt": now
-    }
-    await meeting_summry_collection.insert_one(
-    doc
+    await meeting_summry_collection.update_one(
+        {"sessionId": sessionId},
+        {
+            "$set": {"userId": userId, "summary": summary, "suggestion": suggestion, "updatedAt": now},
+            "$setOnInsert": {"createdAt": now},
+        },
+        upsert=True,
     )
 
 
+@timed_mongo
 async def get_summary_and_suggestion(sessionId: str, userId: Optional[str] = None):
     query = {"sessionId": sessionId}
     if userId:
         query["userId"] = userId
     return await meeting_summry_collection.find_one(query)
 
+@timed_mongo
+async def update_user_profile(email: str, fields: dict):
+    result = await users_collection.update_one(
+        {"email": email},
+        {"$set": {**fields, "updatedAt": datetime.utcnow()}}
+    )
+    return result.modified_count
+
+@timed_mongo
 async def update_user_password(email: str, new_hashed_password: str):
     now = datetime.utcnow()
     result = await users_collection.update_one(
         {"email": email},
         {"$set": {"password": new_hashed_password, "updatedAt": now}}
     )
-    return result.modified_count
\ No newline at end of file
+    return result.modified_count
+
+
+@timed_mongo
+async def save_profile_record(run_id: str, kind: str, name: str, userId: str, sessionId: Optional[str],
+                              s3_url: str, samples: int, wall_seconds: float):
+    doc = {
+        "runId": run_id,
+        "kind": kind,
+        "name": name,
+        "userId": userId,
+        "sessionId": sessionId,
+        "s3_url": s3_url,
+        "format": "folded",
+        "samples": samples,
+        "wallSeconds": wall_seconds,
+        "createdAt": datetime.utcnow()
+    }
+    result = await profiles_collection.insert_one(doc)
+    return result.inserted_id
+
+@timed_mongo
+async def get_profiles_for_session(sessionId: str):
+    cursor = profiles_collection.find({"sessionId": sessionId}, {"_id": 0}).sort("createdAt", DESCENDING)
+    return await cursor.to_list(length=100)
+
+# Speaker voices: one mean embedding (float32 bytes) per non-salesperson voice per meeting.
+# Voices with a `name` make up the owner's speaker index.
+@timed_mongo
+async def save_session_voices(userId: str, sessionId: str, voices: list) -> list:
+    # Returns the new voices' ids, in the order given
+    if not voices:
+        return []
+    now = datetime.utcnow()
+    docs = [{
+        "userId": userId,
+        "sessionId": sessionId,
+        "label": voice["label"],
+        "name": voice.get("name"),
+        "embedding": voice["embedding"],
+        "createdAt": now,
+        "updatedAt": now
+    } for voice in voices]
+    result = await speaker_voices_collection.insert_many(docs)
+    return [str(_id) for _id in result.inserted_ids]
+
+@timed_mongo
+async def get_named_voices(userId: str):
+    cursor = speaker_voices_collection.find(
+        {"userId": userId, "name": {"$ne": None}}, {"name": 1, "embedding": 1}
+    )
+    return await cursor.to_list(length=None)
+
+@timed_mongo
+async def get_named_voices_version(userId: str):
+    # When the user's named voices last changed; any worker's index built before that is stale
+    doc = await speaker_voices_collection.find_one(
+        {"userId": userId, "name": {"$ne": None}}, {"_id": 0, "updatedAt": 1}, sort=[("updatedAt", DESCENDING)]
+    )
+    return doc["updatedAt"] if doc else None
+
+@timed_mongo
+async def name_session_voice(userId: str, sessionId: str, label: str, name: str):
+    return await speaker_voices_collection.find_one_and_update(
+        {"userId": userId, "sessionId": sessionId, "label": label},
+        {"$set": {"name": name, "updatedAt": datetime.utcnow()}},
+    )
+
+@timed_mongo
+async def rename_final_speaker(userId: str, sessionId: str, label: str, name: str):
+    result = await final_col.update_many(
+        {"userId": userId, "sessionId": sessionId},
+        {"$set": {"results.$[segment].speaker": name, "updatedAt": datetime.utcnow()}},
+        array_filters=[{"segment.speaker": label}],
+    )
+    await _flush_pending(transcript_segments_collection)
+    await transcript_segments_collection.update_many(
+        {"userId": userId, "sessionId": sessionId, "source": "final", "speaker": label},
+        {"$set": {"speaker": name}},
+    )
+    return result.modified_count
+
+
+@timed_mongo
+async def search_transcript_segments(userId: str, query: str, limit: int,
+                                     sessionId: Optional[str] = None, source: Optional[str] = None) -> list:
+    # Ranked by Mongo's text score; `query` uses $text syntax ("exact phrase", -excluded)
+    await _flush_pending(transcript_segments_collection)
+    match = {"userId": userId, "$text": {"$search": query}}
+    if sessionId:
+        match["sessionId"] = sessionId
+    if source:
+        match["source"] = source
+    cursor = (
+        transcript_segments_collection.find(match, SEGMENT_SEARCH_PROJECTION)
+        .sort([("score", {"$meta": "textScore"})])
+        .limit(limit)
+    )
+    return await cursor.to_list(length=limit)
+
+
+@timed_mongo
+async def get_meeting_titles(meeting_ids: list) -> dict:
+    ids = [ObjectId(i) for i in meeting_ids if ObjectId.is_valid(i)]
+    cursor = meetings_collection.find({"_id": {"$in": ids}}, {"title": 1})
+    return {str(doc["_id"]): doc.get("title") async for doc in cursor}
+
+
+# Background tasks checkpointed at shutdown, see TaskSupervisor
+@timed_mongo
+async def save_pending_tasks(tasks: list):
+    now = datetime.utcnow()
+    # Not buffered: this runs during shutdown and must land before the process exits
+    await _insert(pending_tasks_collection, [{**task, "createdAt": now} for task in tasks], buffered=False)
+
+
+@timed_mongo
+async def claim_pending_task(names: list) -> Optional[dict]:
+    return await pending_tasks_collection.find_one_and_delete(
+        {"name": {"$in": names}}, sort=[("createdAt", ASCENDING)]
+    )
+
+
+@timed_mongo
+async def get_llm_response(key: str) -> Optional[str]:
+    # The TTL monitor only runs once a minute, so expired entries are filtered here too
+    doc = await llm_responses_collection.find_one(
+        {"key": key, "expiresAt": {"$gt": datetime.utcnow()}}, {"response": 1}
+    )
+    return doc["response"] if doc else None
+
+
+@timed_mongo
+async def save_llm_response(key: str, response: str, expires_at: datetime):
+    await llm_responses_collection.update_one(
+        {"key": key},
+        {"$set": {"response": response, "expiresAt": expires_at, "createdAt": datetime.utcnow()}},
+        upsert=True,
+    )
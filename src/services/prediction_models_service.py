@@ -1,15 +1,41 @@
+import asyncio
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from llama_cpp import Llama
+from src.services.metrics import model_load, record_llm_usage, LLM_CACHE_REQUESTS
+from src.services.mongo_service import get_llm_response, save_llm_response
+from src.utils import TTLCache
 
-MODEL_PATH = os.path.abspath("src/prediction_models/mistral-7b-instruct-v0.1.Q4_K_M.gguf")
+MODEL_PATH = os.path.abspath(os.getenv("LLM_MODEL_PATH", "src/prediction_models/mistral-7b-instruct-v0.1.Q4_K_M.gguf"))
 
-# Load the model
-llm = Llama(
-    model_path=MODEL_PATH,
-    n_ctx=2048,  # context size
-    n_threads=8,  # adjust for your CPU
+# Responses to identical prompts are reused; only deterministic (temperature 0) generations are cached,
+# so callers opt in by passing temperature=0.0
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+# Also keep responses in Mongo, shared by every worker and surviving restarts
+LLM_CACHE_MONGO = os.getenv("LLM_CACHE_MONGO", "0") == "1"
+_response_cache = TTLCache(
+    maxsize=int(os.getenv("LLM_CACHE_SIZE", "512")),
+    ttl=LLM_CACHE_TTL_SECONDS,
 )
 
+# Lookups/generations still running by cache key; an identical prompt meanwhile waits for the same one
+_generating = {}
+
+# llama-cpp isn't thread-safe; one thread runs every generation, off the event loop
+_llm_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm")
+
+# Load the model
+with model_load("llm"):
+    llm = Llama(
+        model_path=MODEL_PATH,
+        n_ctx=2048,  # context size
+        n_threads=8,  # adjust for your CPU
+    )
+
 # Define the prompt
 # prompt = """<s>[INST] Summarize this meeting transcript:
 
@@ -27,7 +53,66 @@ llm = Llama(
 # print(output["choices"][0]["text"])
 
 
-def run_instruction(task: str, content: str, max_tokens: int = 300) -> str:
-    prompt = f"<s>[INST] {task}:\n\n{content}\n\n[/INST]"
-    output = llm(prompt, max_tokens=max_tokens, stop=["</s>"])
+def _generate(prompt: str, max_tokens: int, temperature: float) -> str:
+    start = time.perf_counter()
+    output = llm(prompt, max_tokens=max_tokens, temperature=temperature, stop=["</s>"])
+    record_llm_usage(output.get("usage", {}), time.perf_counter() - start)
     return output["choices"][0]["text"].strip()
+
+
+def cache_key(prompt: str, max_tokens: int, temperature: float) -> str:
+    # Whitespace differences (trailing newlines, double spaces) don't change the answer
+    normalized = " ".join(prompt.split())
+    params = {"model": os.path.basename(MODEL_PATH), "max_tokens": max_tokens, "temperature": temperature}
+    return hashlib.sha256(f"{json.dumps(params, sort_keys=True)}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+# llama-cpp's own default, which every call used before responses were cached
+DEFAULT_TEMPERATURE = 0.8
+
+
+async def run_instruction(task: str, content: str, max_tokens: int = 300, temperature: float = DEFAULT_TEMPERATURE) -> str:
+    prompt = f"<s>[INST] {task}:\n\n{content}\n\n[/INST]"
+    if temperature > 0:
+        # Sampled output is meant to differ between calls
+        LLM_CACHE_REQUESTS.labels("bypass").inc()
+        return await asyncio.get_running_loop().run_in_executor(_llm_executor, _generate, prompt, max_tokens, temperature)
+
+    key = cache_key(prompt, max_tokens, temperature)
+    response = _response_cache.get(key)
+    if response is not None:
+        LLM_CACHE_REQUESTS.labels("hit_memory").inc()
+        return response
+
+    pending = _generating.get(key)
+    if pending is not None:
+        LLM_CACHE_REQUESTS.labels("coalesced").inc()
+    else:
+        pending = asyncio.create_task(_fill(key, prompt, max_tokens, temperature))
+        _generating[key] = pending
+        pending.add_done_callback(lambda _: _generating.pop(key, None))
+    # Shielded, so one caller going away doesn't abort the generation others wait on
+    return await asyncio.shield(pending)
+
+
+async def _fill(key: str, prompt: str, max_tokens: int, temperature: float) -> str:
+    response = None
+    if LLM_CACHE_MONGO:
+        try:
+            response = await get_llm_response(key)
+        except Exception as e:
+            print(f"[WARN] LLM cache lookup failed: {e}")
+        if response is not None:
+            LLM_CACHE_REQUESTS.labels("hit_mongo").inc()
+            _response_cache.set(key, response)
+            return response
+
+    LLM_CACHE_REQUESTS.labels("miss").inc()
+    response = await asyncio.get_running_loop().run_in_executor(_llm_executor, _generate, prompt, max_tokens, temperature)
+    _response_cache.set(key, response)
+    if LLM_CACHE_MONGO:
+        try:
+            await save_llm_response(key, response, datetime.utcnow() + timedelta(seconds=LLM_CACHE_TTL_SECONDS))
+        except Exception as e:
+            print(f"[WARN] Saving LLM response to the cache failed: {e}")
+    return response
@@ -0,0 +1,212 @@
+import asyncio
+import functools
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Optional
+from src.services.s3_service import upload_file_to_s3
+from src.services.mongo_service import save_profile_record
+
+# Who may ask for a profile, how often one is taken without asking, and how finely
+PROFILE_ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("PROFILE_ADMIN_EMAILS", "").split(",") if e.strip()}
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000.0
+PROFILE_HEADER = b"x-profile"
+
+
+class ProfileRun:
+    """One profiled request plus the background tasks it starts.
+
+    Samples are kept as folded stacks ("outer;inner count"), the input format of
+    flamegraph.pl, speedscope and most flamegraph viewers.
+    """
+
+    def __init__(self, name: str, user_id: str):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.user_id = user_id
+        self.session_id = None
+
+
+class _Capture:
+    # Samples one thread, counting only stacks that pass through `root`, i.e. moments
+    # when this request's (or task's) coroutine is the one running on the event loop
+    def __init__(self, thread_id: int, root):
+        self.thread_id = thread_id
+        self.root = root
+        self.stacks = Counter()
+        self.started = time.perf_counter()
+        self.wall_seconds = 0.0
+
+
+class _Sampler:
+    def __init__(self):
+        self._captures = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, capture: _Capture):
+        with self._lock:
+            self._captures.add(capture)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+
+    def remove(self, capture: _Capture):
+        with self._lock:
+            self._captures.discard(capture)
+        capture.wall_seconds = time.perf_counter() - capture.started
+
+    def _run(self):
+        while True:
+            with self._lock:
+                captures = list(self._captures)
+                if not captures:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            for capture in captures:
+                stack = _stack_through(frames.get(capture.thread_id), capture.root)
+                if stack:
+                    capture.stacks[stack] += 1
+            time.sleep(PROFILE_INTERVAL)
+
+
+def _stack_through(frame, root) -> Optional[str]:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        if frame is root:
+            return ";".join(reversed(names))
+        frame = frame.f_back
+    return None
+
+
+_sampler = _Sampler()
+_current_run: ContextVar[Optional[ProfileRun]] = ContextVar("profile_run", default=None)
+
+
+def is_profiling_admin(email: Optional[str]) -> bool:
+    return bool(email) and email.lower() in PROFILE_ADMIN_EMAILS
+
+
+def tag_profile_session(session_id: str):
+    run = _current_run.get()
+    if run is not None and not run.session_id:
+        run.session_id = session_id
+
+
+def _folded(capture: _Capture) -> str:
+    return "\n".join(f"{stack} {count}" for stack, count in capture.stacks.most_common())
+
+
+# Request profiles still being stored
+_saving = set()
+
+
+async def wait_for_profile_saves():
+    await asyncio.gather(*_saving, return_exceptions=True)
+
+
+async def _save(run: ProfileRun, kind: str, capture: _Capture):
+    if not capture.stacks:
+        return
+    try:
+        key = f"profiles/{run.session_id or 'no-session'}/{run.id}_{kind}.folded"
+        s3_url = await asyncio.to_thread(upload_file_to_s3, key, _folded(capture).encode("utf-8"))
+        await save_profile_record(
+            run_id=run.id,
+            kind=kind,
+            name=run.name,
+            userId=run.user_id,
+            sessionId=run.session_id,
+            s3_url=s3_url,
+            samples=sum(capture.stacks.values()),
+            wall_seconds=capture.wall_seconds,
+        )
+    except Exception as e:
+        print(f"Failed to store profile {run.id}/{kind}: {e}")
+
+
+def profiled_task(kind: str):
+    """Profiles a background coroutine when it was started by a profiled request."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            run = _current_run.get()
+            if run is None:
+                return await fn(*args, **kwargs)
+            capture = _Capture(threading.get_ident(), sys._getframe())
+            _sampler.add(capture)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                _sampler.remove(capture)
+                await _save(run, kind, capture)
+
+        return wrapper
+
+    return decorator
+
+
+class ProfilingMiddleware:
+    """Opt-in sampling profiler for admin requests.
+
+    A request is profiled when its bearer token belongs to an admin (PROFILE_ADMIN_EMAILS)
+    and it either sends `X-Profile: 1` or falls into PROFILE_SAMPLE_RATE. The response
+    carries `X-Profile-Id`, which is also the id the stored artifacts are filed under.
+    """
+
+    def __init__(self, app, authenticate: Callable[[str], dict]):
+        self.app = app
+        self.authenticate = authenticate
+
+    def _profile_user(self, headers: dict) -> Optional[str]:
+        if not PROFILE_ADMIN_EMAILS:
+            return None
+        requested = headers.get(PROFILE_HEADER) in (b"1", b"true")
+        if not requested and not (PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE):
+            return None
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        if not authorization.lower().startswith("bearer "):
+            return None
+        try:
+            claims = self.authenticate(authorization[7:].strip())
+        except Exception:
+            return None
+        return claims["user_id"] if is_profiling_admin(claims.get("email")) else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        user_id = self._profile_user(dict(scope["headers"]))
+        if user_id is None:
+            return await self.app(scope, receive, send)
+
+        run = ProfileRun(f"{scope['method']} {scope['path']}", user_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-profile-id", run.id.encode())]
+            await send(message)
+
+        token = _current_run.set(run)
+        capture = _Capture(threading.get_ident(), sys._getframe())
+        _sampler.add(capture)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _sampler.remove(capture)
+            _current_run.reset(token)
+            # The response has been sent by now; storing must not hold up the client further.
+            # The reference keeps the task from being garbage-collected before it finishes
+            saving = asyncio.create_task(_save(run, "request", capture))
+            _saving.add(saving)
+            saving.add_done_callback(_saving.discard)
@@ -1,14 +1,40 @@
+import os
 import boto3
+from src.services.metrics import S3_BYTES, S3_REQUEST_SECONDS
 from src.config import AWS_ACCESS_KEY, AWS_SECRET_KEY, AWS_BUCKET_NAME, AWS_REGION
 
+# Set to use an S3-compatible store (MinIO, LocalStack) instead of AWS
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+PRESIGNED_UPLOAD_EXPIRES_SECONDS = int(os.getenv("PRESIGNED_UPLOAD_EXPIRES_SECONDS", "900"))
+
 s3 = boto3.client("s3", region_name=AWS_REGION,
+    endpoint_url=S3_ENDPOINT_URL,
     aws_access_key_id=AWS_ACCESS_KEY,
     aws_secret_access_key=AWS_SECRET_KEY)
 
-def upload_file_to_s3(key: str, content: bytes):
-    s3.put_object(Bucket=AWS_BUCKET_NAME, Key=f"{key}", Body=content)
+def s3_object_url(key: str) -> str:
+    # Stored URLs keep the AWS form even with S3_ENDPOINT_URL; extract_filename_from_s3_url relies on it
     return f"https://{AWS_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/{key}"
 
+def upload_file_to_s3(key: str, content: bytes):
+    with S3_REQUEST_SECONDS.labels("put_object").time():
+        s3.put_object(Bucket=AWS_BUCKET_NAME, Key=f"{key}", Body=content)
+    S3_BYTES.labels("put_object").inc(len(content))
+    return s3_object_url(key)
+
 def download_file_from_s3(key: str) -> bytes:
-    response = s3.get_object(Bucket=AWS_BUCKET_NAME, Key=f"{key}")
-    return response["Body"].read()
+    with S3_REQUEST_SECONDS.labels("get_object").time():
+        response = s3.get_object(Bucket=AWS_BUCKET_NAME, Key=f"{key}")
+        content = response["Body"].read()
+    S3_BYTES.labels("get_object").inc(len(content))
+    return content
+
+def delete_file_from_s3(key: str):
+    with S3_REQUEST_SECONDS.labels("delete_object").time():
+        s3.delete_object(Bucket=AWS_BUCKET_NAME, Key=f"{key}")
+
+def generate_presigned_upload_url(key: str, expires_in: int = PRESIGNED_UPLOAD_EXPIRES_SECONDS) -> str:
+    # Signing is local to the client, no request is made to S3
+    return s3.generate_presigned_url(
+        "put_object", Params={"Bucket": AWS_BUCKET_NAME, "Key": key}, ExpiresIn=expires_in
+    )
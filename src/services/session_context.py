@@ -0,0 +1,80 @@
+import os
+from typing import Optional
+from bson import ObjectId
+from src.utils import TTLCache
+from src.services.mongo_service import get_meeting_by_id, get_meeting_updated_at, get_salesperson_sample
+from src.services.topic_matcher import SessionTopics, load_session_topics
+
+
+class SessionContext:
+    """What the live and finalize paths need to know about a meeting, read once per session."""
+
+    def __init__(self, sessionId: str, userId: str, meeting: Optional[dict], salesperson_sample: Optional[dict],
+                 topics: Optional[SessionTopics]):
+        self.sessionId = sessionId
+        self.userId = userId
+        self.meeting = meeting or {}
+        self.salesperson_sample = salesperson_sample
+        self.topics = topics
+        self.description = self.meeting.get("description", "")
+        self.product_details = self.meeting.get("product_details", "")
+        self.asr_profile = self.meeting.get("asr_profile")
+
+        # Prompt prefixes are fixed for the whole session
+        self.live_instruction = (
+            f"Suggest improvements for this meeting segment. Meeting Description: {self.description}. "
+            f"Product Details: {self.product_details}."
+        )
+        self.summary_instruction = (
+            f"Summarize the following meeting in a concise paragraph.\n"
+            f"Meeting Description: {self.description}\n"
+            f"Product Details: {self.product_details}"
+        )
+        self.suggestion_instruction = (
+            f"Suggest improvements based on the following meeting.\n"
+            f"Meeting Description: {self.description}\n"
+            f"Product Details: {self.product_details}"
+        )
+
+
+# By (sessionId, userId): the salesperson sample and topic state are the user's own.
+# Per-process, so each use checks the meeting's updatedAt to catch edits made through another worker
+_contexts = TTLCache(
+    maxsize=int(os.getenv("SESSION_CONTEXT_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("SESSION_CONTEXT_TTL_SECONDS", "1800")),
+)
+
+
+async def get_session_context(sessionId: str, userId: str) -> SessionContext:
+    """Raises PermissionError when the session is another user's meeting."""
+    key = (sessionId, userId)
+    context = _contexts.get(key)
+    if context is not None:
+        updated_at = await get_meeting_updated_at(sessionId) if ObjectId.is_valid(sessionId) else None
+        if updated_at == context.meeting.get("updatedAt"):
+            return context
+        _contexts.pop(key)
+    meeting = await get_meeting_by_id(sessionId) if ObjectId.is_valid(sessionId) else None
+    if meeting is not None and meeting.get("userId") != userId:
+        raise PermissionError(f"Session {sessionId} belongs to another user")
+    sample = await get_salesperson_sample(userId)
+    topics = await load_session_topics(meeting, userId) if meeting else None
+    # A concurrent first chunk may have loaded it meanwhile; keep one context (and topic state)
+    context = _contexts.get(key)
+    if context is None or context.meeting.get("updatedAt") != (meeting or {}).get("updatedAt"):
+        context = SessionContext(sessionId, userId, meeting, sample, topics)
+        _contexts.set(key, context)
+    return context
+
+
+def invalidate_session_context(sessionId: str):
+    # Meeting updated or session finalized; the next use reloads from Mongo
+    for key in _contexts.keys():
+        if key[0] == sessionId:
+            _contexts.pop(key)
+
+
+def invalidate_user_session_contexts(userId: str):
+    for key in _contexts.keys():
+        if key[1] == userId:
+            _contexts.pop(key)
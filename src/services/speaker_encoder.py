@@ -0,0 +1,167 @@
+import os
+import tempfile
+from typing import Optional
+import numpy as np
+import torch
+
+# Inference backend for the ECAPA embedding network: eager | torchscript | onnx
+SPEAKER_ENCODER_BACKEND = os.getenv("SPEAKER_ENCODER_BACKEND", "eager")
+# int8 dynamic quantization of the weights (Linear layers for torch, Conv/MatMul for ONNX)
+SPEAKER_ENCODER_QUANTIZE = os.getenv("SPEAKER_ENCODER_QUANTIZE", "0") == "1"
+# Intra-op threads of the ONNX Runtime session; 0 keeps its default. Torch backends share the
+# process-wide torch pool with whisper and pyannote, so it is left alone for them
+SPEAKER_ENCODER_THREADS = int(os.getenv("SPEAKER_ENCODER_THREADS", "0"))
+# Minimum cosine similarity to the eager embeddings a backend must reach to be used
+SPEAKER_ENCODER_PARITY_TOLERANCE = float(os.getenv("SPEAKER_ENCODER_PARITY_TOLERANCE", "0.99"))
+SPEAKER_ENCODER_CACHE_DIR = os.getenv("SPEAKER_ENCODER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "speaker_encoder"))
+
+BACKENDS = ("eager", "torchscript", "onnx")
+
+
+class _EmbeddingOnly(torch.nn.Module):
+    # The exportable part of EncoderClassifier.encode_batch: features in, embeddings out
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, feats):
+        return self.model(feats)
+
+
+class SpeakerEncoder:
+    """Speaker embeddings from a speechbrain EncoderClassifier on a selectable backend.
+
+    Filterbank features and their normalisation always run in speechbrain; only the ECAPA
+    network, which is nearly all of the cost, is swapped for TorchScript or ONNX Runtime.
+    """
+
+    def __init__(self, classifier, backend: str = "eager", quantize: bool = False, threads: int = 0,
+                 device: Optional[torch.device] = None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown speaker encoder backend '{backend}', expected one of {BACKENDS}")
+        self.classifier = classifier
+        self.backend = backend
+        self.quantize = quantize
+        self.threads = threads
+        self.device = device or torch.device("cpu")
+
+        self._run = None
+        if backend == "torchscript":
+            self._run = self._build_torchscript()
+        elif backend == "onnx":
+            self._run = self._build_onnx()
+        elif quantize:
+            self._quantized = torch.ao.quantization.quantize_dynamic(
+                _EmbeddingOnly(self.classifier.mods.embedding_model).eval(), {torch.nn.Linear}, dtype=torch.qint8
+            )
+            self._run = lambda feats: self._quantized(feats)
+
+    @property
+    def name(self) -> str:
+        return f"{self.backend}{'-int8' if self.quantize else ''}"
+
+    def _features(self, wavs: torch.Tensor) -> torch.Tensor:
+        wavs = wavs.float().to(self.device)
+        wav_lens = torch.ones(wavs.shape[0], device=self.device)
+        feats = self.classifier.mods.compute_features(wavs)
+        return self.classifier.mods.mean_var_norm(feats, wav_lens)
+
+    def _build_torchscript(self):
+        module = _EmbeddingOnly(self.classifier.mods.embedding_model).eval()
+        if self.quantize:
+            module = torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+        example = torch.randn(1, 200, _feature_dim(self.classifier), device=self.device)
+        with torch.no_grad():
+            scripted = torch.jit.trace(module, example).eval()
+            if not self.quantize:
+                scripted = torch.jit.optimize_for_inference(scripted)
+        return lambda feats: scripted(feats)
+
+    def _build_onnx(self):
+        import onnxruntime as ort
+
+        os.makedirs(SPEAKER_ENCODER_CACHE_DIR, exist_ok=True)
+        path = os.path.join(SPEAKER_ENCODER_CACHE_DIR, "ecapa.onnx")
+        if not os.path.exists(path):
+            example = torch.randn(1, 200, _feature_dim(self.classifier))
+            torch.onnx.export(
+                _EmbeddingOnly(self.classifier.mods.embedding_model).eval().cpu(), example, path,
+                input_names=["feats"], output_names=["embeddings"],
+                dynamic_axes={"feats": {0: "batch", 1: "frames"}, "embeddings": {0: "batch"}},
+                opset_version=17,
+            )
+        if self.quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantized_path = os.path.join(SPEAKER_ENCODER_CACHE_DIR, "ecapa.int8.onnx")
+            if not os.path.exists(quantized_path):
+                quantize_dynamic(path, quantized_path, weight_type=QuantType.QInt8)
+            path = quantized_path
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+            options.inter_op_num_threads = 1
+        session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+        def run(feats: torch.Tensor) -> torch.Tensor:
+            (embeddings,) = session.run(None, {"feats": feats.detach().cpu().numpy().astype(np.float32)})
+            return torch.from_numpy(embeddings)
+
+        return run
+
+    def encode_batch(self, wavs: torch.Tensor) -> torch.Tensor:
+        # Same contract as EncoderClassifier.encode_batch: [batch, time] -> [batch, 1, dim]
+        if self._run is None:
+            return self.classifier.encode_batch(wavs.to(self.device))
+        with torch.no_grad():
+            embeddings = self._run(self._features(wavs))
+        return embeddings.reshape(wavs.shape[0], 1, -1)
+
+    def encode(self, signal: torch.Tensor) -> np.ndarray:
+        # [channels, time] at 16 kHz -> one embedding averaged over channels
+        return self.encode_batch(signal).squeeze(1).mean(axis=0).detach().cpu().numpy()
+
+
+def _feature_dim(classifier) -> int:
+    return int(getattr(classifier.hparams, "n_mels", 80))
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def check_parity(candidate: SpeakerEncoder, reference: SpeakerEncoder, signals: list) -> dict:
+    """Cosine similarity of `candidate` embeddings against `reference` on the same signals."""
+    scores = [cosine(candidate.encode(signal), reference.encode(signal)) for signal in signals]
+    return {
+        "backend": candidate.name,
+        "min_cosine": min(scores) if scores else None,
+        "mean_cosine": float(np.mean(scores)) if scores else None,
+        "ok": bool(scores) and min(scores) >= SPEAKER_ENCODER_PARITY_TOLERANCE,
+    }
+
+
+def parity_signals(count: int = 4, seed: int = 0) -> list:
+    # Noise bursts of different lengths exercise the variable frame axis of exported graphs
+    generator = torch.Generator().manual_seed(seed)
+    return [torch.randn(1, int(16000 * seconds), generator=generator) * 0.1
+            for seconds in np.linspace(0.6, 6.0, count)]
+
+
+def build_speaker_encoder(classifier, device: Optional[torch.device] = None) -> SpeakerEncoder:
+    eager = SpeakerEncoder(classifier, "eager", device=device)
+    if SPEAKER_ENCODER_BACKEND == "eager" and not SPEAKER_ENCODER_QUANTIZE:
+        return eager
+    try:
+        encoder = SpeakerEncoder(classifier, SPEAKER_ENCODER_BACKEND, SPEAKER_ENCODER_QUANTIZE,
+                                 SPEAKER_ENCODER_THREADS, device=device)
+        parity = check_parity(encoder, eager, parity_signals())
+    except Exception as e:
+        print(f"[WARN] Speaker encoder backend {SPEAKER_ENCODER_BACKEND} unavailable ({e}); using eager")
+        return eager
+    print(f"[INFO] Speaker encoder parity: {parity}")
+    if not parity["ok"]:
+        print(f"[WARN] Speaker encoder {encoder.name} is outside tolerance; using eager")
+        return eager
+    return encoder
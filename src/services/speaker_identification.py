@@ -1,41 +1,40 @@
 from pyannote.audio import Pipeline
-import whisper
-from pydub import AudioSegment
 import os
+import wave
 import torchaudio
 import numpy as np
 import torch
 from speechbrain.inference.speaker import EncoderClassifier
 import json
 from src.config import HUGGINGFACE_TOKEN
+from src.services.metrics import model_load, stage
+from src.services.speaker_encoder import build_speaker_encoder
+from src.services.asr_profiles import get_engine, FINALIZE_ASR_PROFILE
 # from faster_whisper import WhisperModel
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+# Cosine similarity with the salesperson's reference sample needed to label a segment as them
+SALESPERSON_MATCH_THRESHOLD = float(os.getenv("SALESPERSON_MATCH_THRESHOLD", "0.6"))
 
 # Load global models
-pipeline = Pipeline.from_pretrained(
-    "pyannote/speaker-diarization-3.1",
-    use_auth_token=HUGGINGFACE_TOKEN
-)
-speaker_recognizer = EncoderClassifier.from_hparams(
-    source="speechbrain/spkrec-ecapa-voxceleb",
-    run_opts={"device": str(device)}
-)
-whisper_model = whisper.load_model("large")
-# whisper_model = WhisperModel("base")
-
-
-def transcribe_audio(file_path: str) -> str:
-    segments, _ = whisper_model.transcribe(file_path)
-    return " ".join([segment.text for segment in segments])
-
+with model_load("pyannote-diarization"):
+    pipeline = Pipeline.from_pretrained(
+        "pyannote/speaker-diarization-3.1",
+        use_auth_token=HUGGINGFACE_TOKEN
+    )
+with model_load("ecapa-speaker-encoder"):
+    speaker_recognizer = EncoderClassifier.from_hparams(
+        source="speechbrain/spkrec-ecapa-voxceleb",
+        run_opts={"device": str(device)}
+    )
+    speaker_encoder = build_speaker_encoder(speaker_recognizer, device)
 
 
 def load_reference_embedding(audio_path: str) -> np.ndarray:
     ref_signal, ref_fs = torchaudio.load(audio_path)
     if ref_fs != 16000:
         ref_signal = torchaudio.transforms.Resample(orig_freq=ref_fs, new_freq=16000)(ref_signal)
-    embedding = speaker_recognizer.encode_batch(ref_signal.to(device)).squeeze().mean(axis=0).detach().cpu().numpy()
+    embedding = speaker_encoder.encode(ref_signal)
     return embedding
 
 
@@ -47,7 +46,7 @@ def get_segment_embedding(segment_path: str) -> np.ndarray:
     signal, fs = torchaudio.load(segment_path)
     if fs != 16000:
         signal = torchaudio.transforms.Resample(orig_freq=fs, new_freq=16000)(signal)
-    embedding = speaker_recognizer.encode_batch(signal.to(device)).squeeze().mean(axis=0).detach().cpu().numpy()
+    embedding = speaker_encoder.encode(signal)
     return embedding
 
 
@@ -55,54 +54,74 @@ def compute_cosine_similarity(e1, e2) -> float:
     return np.dot(e1, e2) / (np.linalg.norm(e1) * np.linalg.norm(e2))
 
 
-def identify_speaker(segment_embedding: np.ndarray, ref_embedding: np.ndarray, speaker: str, unknown_speakers: dict, counter: int):
+def identify_speaker(segment_embedding: np.ndarray, ref_embedding: np.ndarray, speaker: str, unknown_speakers: dict, counter: int,
+                     speaker_index=None):
     similarity = compute_cosine_similarity(ref_embedding, segment_embedding)
     print(f"[SIMILARITY] Score with Salesperson: {similarity:.4f}")
-    if similarity > 0.6:
+    if similarity > SALESPERSON_MATCH_THRESHOLD:
         print(f"[LABEL] Identified as: Salesperson")
         return "Salesperson", counter
     else:
         if speaker not in unknown_speakers:
-            unknown_speakers[speaker] = f"Speaker {counter}"
-            counter += 1
+            # A voice already named in an earlier meeting keeps its name
+            known_name = speaker_index.match(segment_embedding) if speaker_index is not None else None
+            if known_name:
+                unknown_speakers[speaker] = known_name
+            else:
+                unknown_speakers[speaker] = f"Speaker {counter}"
+                counter += 1
             print(f"[LABEL] Identified as: { unknown_speakers[speaker]}")
         return unknown_speakers[speaker], counter
 
 
-def transcribe_audio(path: str) -> str:
-    result = whisper_model.transcribe(path)
-    return result.get("text", "").strip()
-
-
-def process_segments(diarization, audio_path: str, ref_embedding: np.ndarray):
-    audio = AudioSegment.from_file(audio_path)
-    unknown_speakers = {}
-    counter = 1
-    results = []
-
-    for turn, _, speaker in diarization.itertracks(yield_label=True):
-        duration = turn.end - turn.start
-        if duration < 0.5:
-            segment_duration = turn.end - turn.start
-            print(f"[SKIP] Segment too short ({segment_duration:.2f}s)skipping.")
-            continue
-
-        print(f"[SEGMENT] Speaker: {speaker}, Time: {turn.start:.2f}s - {turn.end:.2f}s")
-        segment = audio[turn.start * 1000: turn.end * 1000]
-        temp_path = f"temp_{speaker}_{turn.start:.2f}.wav"
-        segment.export(temp_path, format="wav")
-
-        segment_embedding = get_segment_embedding(temp_path)
-        speaker_label, counter = identify_speaker(segment_embedding, ref_embedding, speaker, unknown_speakers, counter)
-        text = transcribe_audio(temp_path)
-
-        results.append({
-            "speaker": speaker_label,
-            "start": round(turn.start, 2),
-            "end": round(turn.end, 2),
-            "text": text
-        })
-
-        os.remove(temp_path)
-
-    return results
\ No newline at end of file
+def transcribe_audio(path: str, asr_profile: str = None) -> str:
+    return get_engine(asr_profile, FINALIZE_ASR_PROFILE).transcribe(path)
+
+
+def process_segments(diarization, audio_path: str, ref_embedding: np.ndarray, speaker_index=None, asr_profile: str = None):
+    # Returns the labelled segments and, per non-salesperson label, the mean embedding of
+    # that voice in this meeting so it can be enrolled in the speaker index
+    # The merged recording is PCM WAV; each turn is read from disk on its own
+    # instead of decoding the whole meeting into memory
+    with wave.open(audio_path, "rb") as audio:
+        rate = audio.getframerate()
+        unknown_speakers = {}
+        counter = 1
+        results = []
+        voice_sums = {}
+
+        for turn, _, speaker in diarization.itertracks(yield_label=True):
+            duration = turn.end - turn.start
+            if duration < 0.5:
+                segment_duration = turn.end - turn.start
+                print(f"[SKIP] Segment too short ({segment_duration:.2f}s)skipping.")
+                continue
+
+            print(f"[SEGMENT] Speaker: {speaker}, Time: {turn.start:.2f}s - {turn.end:.2f}s")
+            audio.setpos(min(int(turn.start * rate), audio.getnframes()))
+            frames = audio.readframes(int(duration * rate))
+            temp_path = f"temp_{speaker}_{turn.start:.2f}.wav"
+            with wave.open(temp_path, "wb") as segment:
+                segment.setparams(audio.getparams())
+                segment.writeframes(frames)
+
+            with stage("finalize_speaker_embedding"):
+                segment_embedding = get_segment_embedding(temp_path)
+            speaker_label, counter = identify_speaker(segment_embedding, ref_embedding, speaker, unknown_speakers, counter, speaker_index)
+            if speaker_label != "Salesperson":
+                total, count = voice_sums.get(speaker_label, (0, 0))
+                voice_sums[speaker_label] = (total + segment_embedding, count + 1)
+            with stage("finalize_segment_transcription"):
+                text = transcribe_audio(temp_path, asr_profile)
+
+            results.append({
+                "speaker": speaker_label,
+                "start": round(turn.start, 2),
+                "end": round(turn.end, 2),
+                "text": text
+            })
+
+            os.remove(temp_path)
+
+    voices = {label: total / count for label, (total, count) in voice_sums.items()}
+    return results, voices
\ No newline at end of file
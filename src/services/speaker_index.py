@@ -0,0 +1,99 @@
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from src.services.mongo_service import get_named_voices, get_named_voices_version
+from src.utils import TTLCache
+
+# Cosine similarity a segment needs to be given a known voice's name
+VOICE_MATCH_THRESHOLD = float(os.getenv("VOICE_MATCH_THRESHOLD", "0.7"))
+
+
+class SpeakerIndex:
+    """Nearest-neighbour lookup over one owner's known voices.
+
+    Embeddings are L2-normalised and packed into a contiguous float32 matrix, so a lookup
+    is a single matrix-vector product: ~1 ms for tens of thousands of 192-d ECAPA voices.
+    """
+
+    def __init__(self, dim: int = 192, version=None):
+        self.dim = dim
+        # updatedAt of the newest named voice when the index was loaded
+        self.version = version
+        self._matrix = np.zeros((64, dim), dtype=np.float32)
+        self._size = 0
+        self.labels: List[str] = []
+        self._rows: Dict[str, int] = {}
+
+    def __len__(self):
+        return self._size
+
+    def add(self, voice_id: str, label: str, embedding: np.ndarray):
+        # One row per voice: adding a voice again (e.g. after a rename) replaces its row
+        row = self._rows.get(voice_id)
+        if row is None:
+            if self._size == len(self._matrix):
+                grown = np.zeros((len(self._matrix) * 2, self.dim), dtype=np.float32)
+                grown[:self._size] = self._matrix[:self._size]
+                self._matrix = grown
+            row = self._rows[voice_id] = self._size
+            self._size += 1
+            self.labels.append(label)
+        else:
+            self.labels[row] = label
+        self._matrix[row] = _normalise(embedding)
+
+    def search(self, embedding: np.ndarray, k: int = 1) -> List[Tuple[str, float]]:
+        if not self._size:
+            return []
+        scores = self._matrix[:self._size] @ _normalise(embedding)
+        k = min(k, self._size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.labels[i], float(scores[i])) for i in top]
+
+    def match(self, embedding: np.ndarray, threshold: float = VOICE_MATCH_THRESHOLD) -> Optional[str]:
+        best = self.search(embedding, k=1)
+        if best and best[0][1] >= threshold:
+            return best[0][0]
+        return None
+
+
+def _normalise(embedding: np.ndarray) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def embedding_from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.float32)
+
+
+def embedding_to_bytes(embedding: np.ndarray) -> bytes:
+    return np.asarray(embedding, dtype=np.float32).reshape(-1).tobytes()
+
+
+# Loaded indexes per owner; finalizes of the same user share one until a voice is named anywhere
+_indexes = TTLCache(
+    maxsize=int(os.getenv("SPEAKER_INDEX_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("SPEAKER_INDEX_CACHE_TTL_SECONDS", "3600")),
+)
+
+
+async def load_speaker_index(userId: str) -> SpeakerIndex:
+    # Voices may have been named through another worker, so the cached index is checked
+    # against the newest updatedAt in Mongo, an indexed single-field read
+    version = await get_named_voices_version(userId)
+    index = _indexes.get(userId)
+    if index is None or index.version != version:
+        index = SpeakerIndex(version=version)
+        for voice in await get_named_voices(userId):
+            index.add(str(voice["_id"]), voice["name"], embedding_from_bytes(voice["embedding"]))
+        _indexes.set(userId, index)
+    return index
+
+
+def add_to_loaded_index(userId: str, voice_id: str, name: str, embedding: np.ndarray):
+    # This worker sees the voice at once; the others reload on their next version check
+    index = _indexes.get(userId)
+    if index is not None:
+        index.add(voice_id, name, embedding)
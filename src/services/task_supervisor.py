@@ -0,0 +1,201 @@
+import asyncio
+import contextvars
+import os
+import time
+import traceback
+from typing import Optional
+from src.services.metrics import BACKGROUND_TASKS, BACKGROUND_TASK_SECONDS, BACKGROUND_TASKS_IN_FLIGHT, QUEUE_DEPTH
+from src.services import mongo_service
+
+# How long shutdown waits for queued and running tasks before checkpointing the rest
+TASK_DRAIN_TIMEOUT_SECONDS = float(os.getenv("TASK_DRAIN_TIMEOUT_SECONDS", "20"))
+
+
+class TaskClass:
+    """A named kind of background work: one handler, a worker pool and a bounded queue."""
+
+    def __init__(self, name: str, handler, concurrency: int, max_queue: int):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        # Coalescing keys of queued (not yet started) tasks
+        self.queued_keys = set()
+        self.running = {}
+        self.workers = []
+        # Set when a full queue spilled tasks to the checkpoint collection; cleared once claimed back
+        self.overflowed = False
+        # Checkpoint writes of spilled tasks still in flight
+        self.spilling = set()
+        QUEUE_DEPTH.labels(f"tasks:{name}").set_function(self.queue.qsize)
+
+    def pending(self) -> int:
+        return self.queue.qsize() + len(self.running)
+
+
+class TaskSupervisor:
+    """Runs background work started by requests, owned by the app lifespan.
+
+    Each task class has a fixed number of workers and a bounded queue, so a burst of
+    uploads can't pile up unbounded LLM calls. Tasks are plain (name, args) pairs; on
+    shutdown whatever hasn't finished within the drain timeout is checkpointed to Mongo
+    and replayed by the next `start()`. Tasks submitted to a full queue go to the same
+    checkpoint and are claimed back by the workers as the queue drains.
+    """
+
+    def __init__(self):
+        self.classes = {}
+        self.started = False
+
+    def register(self, name: str, handler, concurrency: int = 1, max_queue: int = 100):
+        self.classes[name] = TaskClass(name, handler, concurrency, max_queue)
+
+    async def start(self):
+        for task_class in self.classes.values():
+            task_class.workers = [
+                asyncio.create_task(self._work(task_class), name=f"{task_class.name}-worker-{i}")
+                for i in range(task_class.concurrency)
+            ]
+        self.started = True
+        await self._replay()
+
+    def submit(self, name: str, *args, key: Optional[str] = None) -> bool:
+        """Queues a task. With `key`, a task of that key already waiting to run absorbs this one.
+
+        Returns False when the class's queue is full and the task was checkpointed to Mongo
+        instead; it runs once the queue has room again (or after a restart).
+        """
+        task_class = self.classes[name]
+        if key is not None and key in task_class.queued_keys:
+            BACKGROUND_TASKS.labels(name, "coalesced").inc()
+            return True
+        if self._enqueue(task_class, args, key):
+            return True
+        print(f"[WARN] {name} queue is full ({task_class.queue.maxsize}); checkpointing task")
+        BACKGROUND_TASKS.labels(name, "spilled").inc()
+        task_class.overflowed = True
+        write = asyncio.create_task(self._spill({"name": name, "args": list(args), "key": key}))
+        task_class.spilling.add(write)
+        write.add_done_callback(task_class.spilling.discard)
+        return False
+
+    @staticmethod
+    async def _spill(task: dict):
+        try:
+            await mongo_service.save_pending_tasks([task])
+        except Exception as e:
+            BACKGROUND_TASKS.labels(task["name"], "failed").inc()
+            print(f"[ERROR] Could not checkpoint a {task['name']} task from a full queue: {e}")
+
+    @staticmethod
+    def _enqueue(task_class: TaskClass, args, key: Optional[str]) -> bool:
+        try:
+            # The submitter's context goes along, so e.g. a profiled request's run covers its task
+            task_class.queue.put_nowait((args, key, contextvars.copy_context()))
+        except asyncio.QueueFull:
+            return False
+        if key is not None:
+            task_class.queued_keys.add(key)
+        return True
+
+    async def _work(self, task_class: TaskClass):
+        in_flight = BACKGROUND_TASKS_IN_FLIGHT.labels(task_class.name)
+        while True:
+            if task_class.overflowed:
+                await self._refill(task_class)
+            args, key, context = await task_class.queue.get()
+            task_class.queued_keys.discard(key)
+            current = asyncio.current_task()
+            task_class.running[current] = (args, key)
+            in_flight.inc()
+            start = time.perf_counter()
+            try:
+                await asyncio.create_task(task_class.handler(*args), context=context)
+                BACKGROUND_TASKS.labels(task_class.name, "succeeded").inc()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                BACKGROUND_TASKS.labels(task_class.name, "failed").inc()
+                print(f"[ERROR] Background task {task_class.name} failed: {e}\n{traceback.format_exc()}")
+            finally:
+                BACKGROUND_TASK_SECONDS.labels(task_class.name).observe(time.perf_counter() - start)
+                in_flight.dec()
+                task_class.running.pop(current, None)
+                task_class.queue.task_done()
+
+    def pending(self) -> int:
+        return sum(task_class.pending() for task_class in self.classes.values())
+
+    async def wait_idle(self, timeout: Optional[float] = None):
+        await asyncio.wait_for(
+            asyncio.gather(*(task_class.queue.join() for task_class in self.classes.values())), timeout
+        )
+
+    async def shutdown(self, timeout: float = TASK_DRAIN_TIMEOUT_SECONDS):
+        # Tasks submitted while draining are queued as usual and checkpointed if they don't get to run
+        try:
+            await self.wait_idle(timeout)
+        except asyncio.TimeoutError:
+            print(f"[WARN] {self.pending()} background tasks still pending after {timeout}s; checkpointing")
+
+        leftover = []
+        for task_class in self.classes.values():
+            # Spilled tasks are already on their way to the checkpoint
+            await asyncio.gather(*task_class.spilling, return_exceptions=True)
+            # Interrupted tasks are re-run from the start, so handlers must be safe to repeat
+            leftover += [{"name": task_class.name, "args": list(args), "key": key}
+                         for args, key in task_class.running.values()]
+            while not task_class.queue.empty():
+                args, key, _ = task_class.queue.get_nowait()
+                task_class.queue.task_done()
+                leftover.append({"name": task_class.name, "args": list(args), "key": key})
+            task_class.queued_keys.clear()
+            for worker in task_class.workers:
+                worker.cancel()
+            await asyncio.gather(*task_class.workers, return_exceptions=True)
+            task_class.workers = []
+
+        if leftover:
+            await mongo_service.save_pending_tasks(leftover)
+            for task in leftover:
+                BACKGROUND_TASKS.labels(task["name"], "checkpointed").inc()
+        self.started = False
+
+    async def _replay(self):
+        # Each worker claims a checkpoint atomically, so several replicas can start at once.
+        # Only classes with queue room are claimed from; the rest stay checkpointed for the next start.
+        while True:
+            names = [name for name, task_class in self.classes.items() if not task_class.queue.full()]
+            if not names or not await self._claim(names):
+                return
+
+    async def _refill(self, task_class: TaskClass):
+        # Takes spilled tasks back while the queue has room; until every spill write has landed
+        # an empty claim doesn't mean they have all been taken
+        try:
+            while not task_class.queue.full():
+                if not await self._claim([task_class.name]):
+                    if not task_class.spilling:
+                        task_class.overflowed = False
+                    return
+        except Exception as e:
+            print(f"[ERROR] Could not claim checkpointed {task_class.name} tasks: {e}")
+
+    async def _claim(self, names: list) -> bool:
+        task = await mongo_service.claim_pending_task(names)
+        if task is None:
+            return False
+        task_class = self.classes[task["name"]]
+        if task.get("key") is not None and task["key"] in task_class.queued_keys:
+            BACKGROUND_TASKS.labels(task["name"], "coalesced").inc()
+        elif self._enqueue(task_class, task["args"], task.get("key")):
+            BACKGROUND_TASKS.labels(task["name"], "replayed").inc()
+        else:
+            # Filled up while the claim was in flight; put the checkpoint back
+            await mongo_service.save_pending_tasks([
+                {"name": task["name"], "args": task["args"], "key": task.get("key")}
+            ])
+        return True
+
+
+supervisor = TaskSupervisor()
@@ -0,0 +1,118 @@
+import re
+from collections import deque
+from typing import Optional
+from src.services.mongo_service import get_topic_coverage, save_prediction_result
+
+# `question` of the coverage events written to the predictions collection
+TOPIC_COVERAGE_QUESTION = "topic_coverage"
+
+
+def normalize(text: str) -> str:
+    # Lowercase words separated by single spaces, padded so every phrase match is whole-word
+    return " " + " ".join(re.findall(r"\w+", text.lower())) + " "
+
+
+class TopicMatcher:
+    """Aho-Corasick automaton over a meeting's topics and their synonyms.
+
+    One pass over a transcript finds every phrase of every topic, however many there are.
+    """
+
+    def __init__(self, phrases: dict):
+        # phrases: normalized phrase -> topic
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for phrase, topic in phrases.items():
+            state = 0
+            for char in phrase:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._out[state].append((topic, phrase.strip()))
+        self.longest = max((len(phrase) for phrase in phrases), default=0)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    @classmethod
+    def for_meeting(cls, topics: list, synonyms: Optional[dict] = None) -> "TopicMatcher":
+        phrases = {}
+        for topic in topics:
+            for phrase in [topic, *(synonyms or {}).get(topic, [])]:
+                key = normalize(phrase)
+                if key.strip():
+                    phrases.setdefault(key, topic)
+        return cls(phrases)
+
+    def scan(self, normalized: str):
+        """Yields (topic, phrase) for every match in already-normalized text."""
+        state = 0
+        for char in normalized:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            yield from self._out[state]
+
+
+class SessionTopics:
+    """Coverage of one meeting's topics, fed chunk transcripts as they arrive."""
+
+    def __init__(self, topics: list, matcher: TopicMatcher, covered: Optional[dict] = None):
+        self.topics = topics
+        self.matcher = matcher
+        self.covered = covered or {}
+        # End of the previous chunk, so phrases split across two chunks still match
+        self._tail = " "
+
+    def feed(self, transcript: str, seq: Optional[int] = None) -> list:
+        text = normalize(transcript or "")
+        window = self._tail + text[1:]
+        self._tail = window[-self.matcher.longest:] if self.matcher.longest else " "
+        newly = []
+        for topic, phrase in self.matcher.scan(window):
+            if topic not in self.covered:
+                self.covered[topic] = {"topic": topic, "phrase": phrase, "seq": seq}
+                newly.append(self.covered[topic])
+        return newly
+
+    def not_covered(self) -> list:
+        return [topic for topic in self.topics if topic not in self.covered]
+
+    def summary(self) -> dict:
+        return {
+            "topics": self.topics,
+            "covered": [self.covered[topic] for topic in self.topics if topic in self.covered],
+            "notCovered": self.not_covered(),
+        }
+
+
+async def load_session_topics(meeting: dict, userId: str) -> SessionTopics:
+    topics = meeting.get("topics") or []
+    # Topics covered before a restart (or on another worker) stay covered
+    covered = {
+        event["topic"]: {"topic": event["topic"], "phrase": event.get("phrase"), "seq": event.get("seq")}
+        for event in await get_topic_coverage(userId, str(meeting["_id"]), TOPIC_COVERAGE_QUESTION)
+    }
+    return SessionTopics(topics, TopicMatcher.for_meeting(topics, meeting.get("topic_synonyms")), covered)
+
+
+async def track_topic_coverage(tracker: SessionTopics, sessionId: str, userId: str, transcript: str,
+                               seq: Optional[int] = None) -> list:
+    """Matches a new chunk transcript and records a coverage event for each newly covered topic."""
+    newly = tracker.feed(transcript, seq)
+    for event in newly:
+        await save_prediction_result(userId, sessionId, TOPIC_COVERAGE_QUESTION, event["topic"], "covered",
+                                     details={"phrase": event["phrase"], "seq": event["seq"]})
+    return [event["topic"] for event in newly]
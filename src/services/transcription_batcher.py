@@ -0,0 +1,83 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+# How long the first chunk of a batch may wait for company, and how many chunks one
+# batched inference call may carry. Together they bound the queueing part of p99 latency.
+BATCH_MAX_WAIT_MS = float(os.getenv("WHISPER_BATCH_MAX_WAIT_MS", "20"))
+BATCH_MAX_SIZE = int(os.getenv("WHISPER_BATCH_MAX_SIZE", "8"))
+
+
+class TranscriptionBatcher:
+    """Collects chunks from concurrent requests and transcribes them as one batch.
+
+    `transcribe_batch` receives a list of audio payloads and must return one transcript
+    per payload, in order; an exception in a payload's place fails only that request. It runs on a single dedicated thread so the event loop never
+    blocks on inference and batches never compete with each other for cores.
+    """
+
+    def __init__(self, transcribe_batch: Callable[[List[bytes]], List[str]],
+                 max_batch_size: int = BATCH_MAX_SIZE, max_wait_ms: float = BATCH_MAX_WAIT_MS):
+        self._transcribe_batch = transcribe_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper-batch")
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def transcribe(self, audio_bytes: bytes) -> str:
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((audio_bytes, future))
+        return await future
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Anything that arrived while we were waiting rides along for free
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Requests that were cancelled (client went away) are not worth decoding
+            batch = [(audio, future) for audio, future in batch if not future.done()]
+            if not batch:
+                continue
+            try:
+                texts = await loop.run_in_executor(
+                    self._executor, self._transcribe_batch, [audio for audio, _ in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), text in zip(batch, texts):
+                if future.done():
+                    continue
+                if isinstance(text, Exception):
+                    future.set_exception(text)
+                else:
+                    future.set_result(text)
@@ -1,41 +1,124 @@
-from faster_whisper import WhisperModel
-import tempfile
+from faster_whisper import decode_audio
+import numpy as np
+import io
 import os
+import time
+from typing import Optional
+from src.services.transcription_batcher import TranscriptionBatcher
+from src.services.metrics import stage, QUEUE_DEPTH
+from src.services.asr_profiles import AsrEngine, get_engine, LIVE_ASR_PROFILE
 
-# Load the model once
-model = WhisperModel("base", compute_type="int8")
+SAMPLE_RATE = 16000
+# Whisper attends to at most 30s of audio per window, so longer chunks are split
+WINDOW_SAMPLES = 30 * SAMPLE_RATE
 
-def transcribe_audio_bytes(audio_bytes: bytes) -> str:
-    # Use delete=False to avoid PermissionError on Windows
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-        tmp.write(audio_bytes)
-        tmp.flush()
-        tmp_path = tmp.name  # Store path so we can use and delete it later
+# Cross-request batching can be switched off to fall back to one transcribe call per chunk
+BATCHING_ENABLED = os.getenv("WHISPER_BATCHING", "1") == "1"
+# Most windows one batched inference call decodes at once
+BATCH_INFERENCE_SIZE = int(os.getenv("WHISPER_BATCH_INFERENCE_SIZE", "16"))
+# Optionally pin the language of every chunk; by default it's detected per chunk, for the
+# whole batch in one encoder pass
+BATCH_LANGUAGE = os.getenv("WHISPER_BATCH_LANGUAGE") or None
 
-    try:
-        segments, _ = model.transcribe(tmp_path)
 
-        full_text = ""
-        for segment in segments:
-            full_text += segment.text.strip() + " "
+def transcribe_audio_bytes(audio_bytes: bytes, profile: Optional[str] = None) -> str:
+    return get_engine(profile, LIVE_ASR_PROFILE).transcribe(io.BytesIO(audio_bytes))
 
-        return full_text.strip()
 
-    finally:
-        # Manually delete the temp file
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+def transcribe_audio_batch(engine: AsrEngine, audio_chunks: list) -> list:
+    # Chunks come from different requests (and users), so every chunk gets windows of its
+    # own: each is padded to a whole number of 30s windows before the chunks are laid end
+    # to end, and the pipeline decodes every window as a separate clip. No window, and so
+    # no decoded segment, ever holds audio of two chunks.
+    # A chunk that can't be decoded gets its error back in its slot; the rest still run.
+    texts = [""] * len(audio_chunks)
+    audios = {}
+    for i, chunk in enumerate(audio_chunks):
+        try:
+            audio = decode_audio(io.BytesIO(chunk), sampling_rate=SAMPLE_RATE)
+        except Exception as e:
+            texts[i] = e
+            continue
+        if len(audio):
+            audios[i] = audio
+    if not audios:
+        return texts
 
+    if BATCH_LANGUAGE:
+        languages = dict.fromkeys(audios, BATCH_LANGUAGE)
+    else:
+        languages = dict(zip(audios, engine.detect_languages(list(audios.values()))))
 
+    started = time.perf_counter()
+    with stage("live_transcription_batch"):
+        # One call per language, as the pipeline decodes a whole call in one language
+        for language in dict.fromkeys(languages.values()):
+            members = [i for i, lang in languages.items() if lang == language]
+            if not members:
+                continue
+            padded = [np.pad(audios[i], (0, -len(audios[i]) % WINDOW_SAMPLES)) for i in members]
+            bounds = []
+            clips = []
+            offset = 0
+            for audio in padded:
+                bounds.append((offset / SAMPLE_RATE, (offset + len(audio)) / SAMPLE_RATE))
+                for start in range(offset, offset + len(audio), WINDOW_SAMPLES):
+                    clips.append({"start": start / SAMPLE_RATE, "end": (start + WINDOW_SAMPLES) / SAMPLE_RATE})
+                offset += len(audio)
 
-# import whisper
+            segments, _ = engine.batched.transcribe(
+                np.concatenate(padded),
+                language=language,
+                vad_filter=False,
+                clip_timestamps=clips,
+                batch_size=min(len(clips), BATCH_INFERENCE_SIZE),
+                **engine.decode_options,
+            )
+            parts = assign_segments(segments, bounds)
+            for i, chunk_parts in zip(members, parts):
+                texts[i] = " ".join(t for t in chunk_parts if t)
+    engine.record(sum(len(audio) for audio in audios.values()) / SAMPLE_RATE, time.perf_counter() - started)
+    return texts
 
-# def load_whisper_model():
-#     print("[INFO] Loading Whisper model...")
-#     model = whisper.load_model("large")
-#     return model
 
-def transcribe_segment(audio_path):
-    result = model.transcribe(audio_path)
-    text = result.get("text", "").strip()
-    return text
+def assign_segments(segments, bounds: list) -> list:
+    """Texts of `segments` per (start, end) span in `bounds`, each going to the span it overlaps most."""
+    texts = [[] for _ in bounds]
+    for segment in segments:
+        overlaps = [min(segment.end, end) - max(segment.start, start) for start, end in bounds]
+        best = max(range(len(bounds)), key=overlaps.__getitem__)
+        if overlaps[best] > 0 or segment.start == segment.end:
+            texts[best].append(segment.text.strip())
+    return texts
+
+
+def _transcribe_each(engine: AsrEngine, audio_chunks: list) -> list:
+    texts = []
+    with stage("live_transcription_batch"):
+        for chunk in audio_chunks:
+            try:
+                texts.append(engine.transcribe(io.BytesIO(chunk)))
+            except Exception as e:
+                texts.append(e)
+    return texts
+
+
+# One batcher per ASR profile; a batch only ever holds chunks for the same model
+_batchers = {}
+
+
+def get_batcher(profile: Optional[str] = None) -> TranscriptionBatcher:
+    engine = get_engine(profile, LIVE_ASR_PROFILE)
+    batcher = _batchers.get(engine.name)
+    if batcher is None:
+        if BATCHING_ENABLED and engine.supports_batching:
+            batcher = TranscriptionBatcher(lambda chunks: transcribe_audio_batch(engine, chunks))
+        else:
+            batcher = TranscriptionBatcher(lambda chunks: _transcribe_each(engine, chunks), max_batch_size=1, max_wait_ms=0)
+        QUEUE_DEPTH.labels(f"transcription_batcher:{engine.name}").set_function(batcher.qsize)
+        _batchers[engine.name] = batcher
+    return batcher
+
+
+async def transcribe_chunk(audio_bytes: bytes, profile: Optional[str] = None) -> str:
+    return await get_batcher(profile).transcribe(audio_bytes)
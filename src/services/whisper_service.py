@@ -1,7 +1,5 @@
-from faster_whisper import WhisperModel
+from src.services.asr_profiles import get_engine, LIVE_ASR_PROFILE
 
-model = WhisperModel("base")
 
 def transcribe_audio(file_path: str) -> str:
-    segments, _ = model.transcribe(file_path)
-    return " ".join([segment.text for segment in segments])
+    return get_engine(LIVE_ASR_PROFILE).transcribe(file_path)
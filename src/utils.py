@@ -1,6 +1,18 @@
+import asyncio
+import os
+import time
 import bcrypt
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, unquote
 
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+# while capping how many cores a login burst can take away from chunk uploads
+_bcrypt_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("BCRYPT_WORKERS", "2")),
+    thread_name_prefix="bcrypt",
+)
+
 
 def hash_password(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
@@ -8,6 +20,58 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_bcrypt_executor, hash_password, password)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(_bcrypt_executor, verify_password, password, hashed)
+
+
+class TTLCache:
+    """Small in-process LRU cache whose entries also expire after a TTL.
+
+    `set` accepts an absolute `expires_at` (time.time() based) to cut an entry's
+    lifetime shorter than the default TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        value, expires_at = item
+        if expires_at <= time.time():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, expires_at: float = None):
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        self._data[key] = (value, deadline)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        item = self._data.pop(key, None)
+        return item[0] if item else default
+
+    def clear(self):
+        self._data.clear()
+
+    def keys(self) -> list:
+        return list(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
 # def extract_filename_from_s3_url(s3_url: str) -> str:
 #     return s3_url.split("/")[-2]
 
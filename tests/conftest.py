@@ -0,0 +1,25 @@
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# src/config.py holds deployment settings and isn't checked in; tests only need the names
+try:
+    import src.config  # noqa: F401
+except ImportError:
+    sys.modules["src.config"] = types.SimpleNamespace(MONGO_URL="mongodb://localhost:27017", MONGO_DB_NAME="test")
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """The Mongo service bound to a fresh in-memory database."""
+    from mongomock_motor import AsyncMongoMockClient
+    from src.services import mongo_service
+
+    client = AsyncMongoMockClient()
+    monkeypatch.setattr(mongo_service, "client", client)
+    mongo_service.use_database(client["test"])
+    return client["test"]
@@ -0,0 +1,25 @@
+import wave
+
+from src.services import audio_merge_service
+from src.services.audio_merge_service import merge_audio_chunks
+
+
+def write_wav(path, channels, sample_width, rate, frames):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(sample_width)
+        f.setframerate(rate)
+        f.writeframes(b"\x01" * (frames * channels * sample_width))
+
+
+def test_wav_storage_keeps_the_uploaded_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio_merge_service, "AUDIO_STORAGE_CODEC", "wav")
+    chunks = [tmp_path / "a.wav", tmp_path / "b.wav"]
+    write_wav(chunks[0], 2, 2, 44100, 44100)
+    write_wav(chunks[1], 2, 2, 44100, 22050)
+
+    merge_audio_chunks([str(path) for path in chunks], str(tmp_path / "merged.wav"))
+
+    with wave.open(str(tmp_path / "merged.wav"), "rb") as merged:
+        assert (merged.getnchannels(), merged.getsampwidth(), merged.getframerate()) == (2, 2, 44100)
+        assert merged.getnframes() == 66150
@@ -0,0 +1,45 @@
+import time
+
+import jwt
+import pytest
+
+from src.routes import auth
+from src.routes.auth import JWT_ALGORITHM, JWT_SECRET, decode_token
+
+
+@pytest.fixture(autouse=True)
+def empty_token_cache():
+    auth._token_cache.clear()
+
+
+def make_token(exp: float) -> str:
+    return jwt.encode({"email": "a@example.com", "user_id": "u1", "exp": int(exp)}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+
+def test_valid_token_is_decoded_once_then_served_from_the_cache(monkeypatch):
+    token = make_token(time.time() + 3600)
+    calls = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(auth.jwt, "decode", lambda *args, **kwargs: calls.append(1) or real_decode(*args, **kwargs))
+
+    assert decode_token(token) == {"email": "a@example.com", "user_id": "u1"}
+    assert decode_token(token) == {"email": "a@example.com", "user_id": "u1"}
+    assert len(calls) == 1
+
+
+def test_cached_token_stops_validating_after_its_exp():
+    token = make_token(time.time() + 1)
+    decode_token(token)
+    assert auth._token_cache.get(token) is not None
+
+    time.sleep(1.1)
+    assert auth._token_cache.get(token) is None
+    with pytest.raises(jwt.ExpiredSignatureError):
+        decode_token(token)
+
+
+def test_token_without_user_id_is_rejected():
+    token = jwt.encode({"email": "a@example.com", "exp": int(time.time()) + 60}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    with pytest.raises(auth.HTTPException) as error:
+        decode_token(token)
+    assert error.value.status_code == 401
@@ -0,0 +1,41 @@
+import os
+import time
+
+from src.services.chunk_cache import ChunkCache
+
+
+def test_hit_places_the_chunk_and_a_miss_reports_false(tmp_path):
+    cache = ChunkCache(str(tmp_path / "cache"), max_bytes=1024, max_age=60)
+    cache.put("audio_recording/s1_000000_a.wav", b"abc")
+    assert cache.copy_to("audio_recording/s1_000000_a.wav", str(tmp_path / "a.wav"))
+    assert (tmp_path / "a.wav").read_bytes() == b"abc"
+    assert not cache.copy_to("audio_recording/s1_000001_b.wav", str(tmp_path / "b.wav"))
+
+
+def test_least_recently_used_goes_first_past_the_size_limit(tmp_path):
+    cache = ChunkCache(str(tmp_path / "cache"), max_bytes=25, max_age=60)
+    cache.put("a", b"x" * 10)
+    time.sleep(0.01)
+    cache.put("b", b"y" * 10)
+    time.sleep(0.01)
+    assert cache.copy_to("a", str(tmp_path / "a"))
+    time.sleep(0.01)
+    cache.put("c", b"z" * 10)
+    assert not cache.copy_to("b", str(tmp_path / "b"))
+    assert cache.copy_to("a", str(tmp_path / "a2")) and cache.copy_to("c", str(tmp_path / "c"))
+
+
+def test_writes_of_other_workers_count_towards_the_limit(tmp_path):
+    directory = str(tmp_path / "cache")
+    workers = [ChunkCache(directory, max_bytes=25, max_age=60, prune_interval=0) for _ in range(3)]
+    for i, worker in enumerate(workers):
+        worker.put(f"chunk{i}", b"x" * 10)
+        time.sleep(0.01)
+    assert sum(os.path.getsize(entry.path) for entry in os.scandir(directory)) <= 25
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ChunkCache(str(tmp_path / "cache"), max_bytes=1024, max_age=0)
+    cache.put("a", b"abc")
+    time.sleep(0.01)
+    assert not cache.copy_to("a", str(tmp_path / "a"))
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from src.services import mongo_service
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def _chunk_hashes(db):
+    doc = await db["chunks"].find_one({"sessionId": "s1"})
+    return [(chunk["contentHash"], chunk["seq"]) for chunk in doc["chunks"]]
+
+
+def test_identical_chunks_without_seq_are_all_kept(db):
+    async def scenario():
+        for _ in range(2):
+            added = await mongo_service.save_chunk_metadata("s1", "audio_recording/s1_silence.wav", "u1",
+                                                            "", "https://s3/silence.wav", "h1", None)
+            assert added
+        return await _chunk_hashes(db)
+
+    assert run(scenario()) == [("h1", None), ("h1", None)]
+
+
+def test_retried_chunk_with_seq_is_recorded_once(db):
+    async def scenario():
+        first = await mongo_service.save_chunk_metadata("s1", "c0", "u1", "hi", "https://s3/c0", "h1", 0)
+        retry = await mongo_service.save_chunk_metadata("s1", "c0", "u1", "hi", "https://s3/c0", "h1", 0)
+        repeat = await mongo_service.save_chunk_metadata("s1", "c1", "u1", "hi", "https://s3/c1", "h1", 1)
+        return (first, retry, repeat), await _chunk_hashes(db)
+
+    assert run(scenario()) == ((True, False, True), [("h1", 0), ("h1", 1)])
+
+
+def test_presigned_upload_is_only_found_for_its_user_session_and_lifetime(db):
+    from datetime import datetime, timedelta
+
+    async def scenario():
+        later = datetime.utcnow() + timedelta(minutes=5)
+        await mongo_service.save_presigned_upload("audio_recording/s1_k", "s1", "u1", 3, later)
+        await mongo_service.save_presigned_upload("audio_recording/s1_old", "s1", "u1", 4, datetime.utcnow() - timedelta(seconds=1))
+        await mongo_service.complete_presigned_upload("audio_recording/s1_k", {"chunk": "audio_recording/s1_k"})
+        return [
+            await mongo_service.get_presigned_upload("audio_recording/s1_k", "s1", "u1"),
+            await mongo_service.get_presigned_upload("audio_recording/s1_k", "s1", "u2"),
+            await mongo_service.get_presigned_upload("audio_recording/s1_k", "s2", "u1"),
+            await mongo_service.get_presigned_upload("audio_recording/s1_old", "s1", "u1"),
+        ]
+
+    mine, other_user, other_session, expired = run(scenario())
+    assert (mine["seq"], mine["result"]) == (3, {"chunk": "audio_recording/s1_k"})
+    assert other_user is None and other_session is None and expired is None
+
+
+def test_write_behind_close_waits_for_the_batch_being_written():
+    class SlowCollection:
+        name = full_name = "test.slow"
+
+        def __init__(self):
+            self.written = []
+
+        async def insert_many(self, docs, ordered=True):
+            await asyncio.sleep(0.05)
+            self.written.extend(docs)
+
+    async def scenario():
+        buffer = mongo_service.WriteBehindBuffer(max_batch=2, flush_interval=10)
+        collection = SlowCollection()
+        buffer.add(collection, [{"i": 0}, {"i": 1}])
+        await asyncio.sleep(0.01)  # the loop is now inside insert_many
+        buffer.add(collection, [{"i": 2}])
+        await buffer.close()
+        return collection.written
+
+    assert [doc["i"] for doc in run(scenario())] == [0, 1, 2]
+
+
+def test_service_used_before_connect_fails_clearly(monkeypatch):
+    monkeypatch.setattr(mongo_service, "client", None)
+    mongo_service.use_database(mongo_service._NotConnected())
+    with pytest.raises(RuntimeError, match="not connected"):
+        run(mongo_service.get_chunk_list("s1"))
+
+
+def test_presigned_upload_is_claimed_by_one_ingest_at_a_time(db):
+    from datetime import datetime, timedelta
+
+    async def scenario():
+        key = "audio_recording/s1_k"
+        await mongo_service.save_presigned_upload(key, "s1", "u1", None, datetime.utcnow() + timedelta(minutes=5))
+        first, second = await asyncio.gather(
+            mongo_service.claim_presigned_upload(key, "s1", "u1", 300),
+            mongo_service.claim_presigned_upload(key, "s1", "u1", 300),
+        )
+        # A failed ingest hands the key back to the next retry
+        await mongo_service.release_presigned_upload(key)
+        retry = await mongo_service.claim_presigned_upload(key, "s1", "u1", 300)
+        # A claim held past its lease is taken over
+        takeover = await mongo_service.claim_presigned_upload(key, "s1", "u1", -1)
+        await mongo_service.complete_presigned_upload(key, {"chunk": key})
+        after_done = await mongo_service.claim_presigned_upload(key, "s1", "u1", -1)
+        other_user = await mongo_service.claim_presigned_upload(key, "s1", "u2", -1)
+        return [first, second, retry, takeover, after_done, other_user]
+
+    first, second, retry, takeover, after_done, other_user = run(scenario())
+    assert [claim is not None for claim in (first, second)].count(True) == 1
+    assert retry["status"] == takeover["status"] == "ingesting"
+    assert after_done is None and other_user is None
+
+
+def test_repeated_finalize_keeps_one_summary_per_session(db):
+    async def scenario():
+        await mongo_service.update_final_summary_and_suggestion("s1", "u1", "first", "try this")
+        await mongo_service.update_final_summary_and_suggestion("s1", "u1", "second", "try that")
+        return await db["meetingSummrys"].find({"sessionId": "s1"}).to_list(length=None)
+
+    docs = run(scenario())
+    assert [(doc["summary"], doc["suggestion"]) for doc in docs] == [("second", "try that")]
+    assert docs[0]["createdAt"] <= docs[0]["updatedAt"]
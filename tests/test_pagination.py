@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from src.routes.pagination import PageParams, stream_page
+from src.services import mongo_service
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def read_page(cursor, limit, serialize=lambda doc: {"id": str(doc["_id"])}):
+    response = stream_page(cursor, serialize, limit)
+    return json.loads(b"".join([chunk async for chunk in response.body_iterator]))
+
+
+async def fetch_pages(limit):
+    pages, cursor = [], None
+    while True:
+        mongo_cursor = await mongo_service.find_suggestions_by_user_and_session("u1", "s1", limit, cursor)
+        page = await read_page(mongo_cursor, limit)
+        pages.append(page)
+        cursor = page["nextCursor"]
+        if cursor is None:
+            return pages
+
+
+async def insert_suggestions(db, n):
+    result = await db["suggestions"].insert_many(
+        [{"userId": "u1", "sessionId": "s1", "suggestion": str(i), "transcript": "t"} for i in range(n)]
+    )
+    return [str(_id) for _id in result.inserted_ids]
+
+
+def test_malformed_cursor_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        PageParams(limit=10, cursor="not-an-object-id")
+    assert error.value.status_code == 400
+
+
+def test_valid_cursor_is_accepted():
+    cursor = str(ObjectId())
+    assert PageParams(limit=10, cursor=cursor).cursor == cursor
+
+
+def test_cursor_round_trips_through_every_page_newest_first(db):
+    async def scenario():
+        ids = await insert_suggestions(db, 5)
+        return ids, await fetch_pages(2)
+
+    ids, pages = run(scenario())
+    assert [len(page["items"]) for page in pages] == [2, 2, 1]
+    assert [item["id"] for page in pages for item in page["items"]] == ids[::-1]
+    assert pages[0]["nextCursor"] == pages[0]["items"][-1]["id"]
+
+
+def test_full_last_page_is_followed_by_an_empty_one(db):
+    # With exactly `limit` documents left the stream can't know it's the end without another read
+    async def scenario():
+        await insert_suggestions(db, 4)
+        return await fetch_pages(2)
+
+    pages = run(scenario())
+    assert [len(page["items"]) for page in pages] == [2, 2, 0]
+    assert pages[1]["nextCursor"] is not None
+    assert pages[2] == {"items": [], "nextCursor": None}
+
+
+def test_async_serializers_are_awaited():
+    async def docs():
+        for _ in range(2):
+            yield {"_id": ObjectId()}
+
+    async def serialize(doc):
+        return {"ok": True}
+
+    page = run(read_page(docs(), 3, serialize))
+    assert page == {"items": [{"ok": True}, {"ok": True}], "nextCursor": None}
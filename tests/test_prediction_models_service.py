@@ -0,0 +1,73 @@
+import asyncio
+import sys
+import types
+
+import pytest
+
+# The service loads the GGUF model at import; tests never generate with it
+if "src.services.prediction_models_service" not in sys.modules:
+    sys.modules["llama_cpp"] = types.SimpleNamespace(Llama=lambda **kwargs: None)
+
+from src.services import prediction_models_service as service  # noqa: E402
+from src.services.prediction_models_service import cache_key, run_instruction  # noqa: E402
+
+
+@pytest.fixture
+def generations(monkeypatch):
+    calls = []
+
+    def generate(prompt, max_tokens, temperature):
+        calls.append(prompt)
+        return f"answer {len(calls)}"
+
+    service._response_cache.clear()
+    monkeypatch.setattr(service, "_generate", generate)
+    monkeypatch.setattr(service, "LLM_CACHE_MONGO", False)
+    return calls
+
+
+def test_cache_key_ignores_whitespace_differences():
+    assert cache_key("Summarize:\n\nhello  world\n", 300, 0.0) == cache_key("Summarize: hello world", 300, 0.0)
+
+
+def test_cache_key_covers_prompt_and_generation_parameters():
+    key = cache_key("Summarize: hello", 300, 0.0)
+    assert cache_key("Summarize: hullo", 300, 0.0) != key
+    assert cache_key("Summarize: hello", 200, 0.0) != key
+    assert cache_key("Summarize: hello", 300, 0.5) != key
+
+
+def test_sampled_generations_bypass_the_cache(generations):
+    async def scenario():
+        return [await run_instruction("Suggest", "same transcript") for _ in range(2)]
+
+    assert asyncio.run(scenario()) == ["answer 1", "answer 2"]
+    assert service.DEFAULT_TEMPERATURE > 0
+    assert len(service._response_cache) == 0
+
+
+def test_deterministic_generations_are_cached(generations):
+    async def scenario():
+        first = await run_instruction("Summarize", "transcript", temperature=0.0)
+        again = await run_instruction("Summarize", "transcript ", temperature=0.0)
+        other = await run_instruction("Summarize", "another transcript", temperature=0.0)
+        return first, again, other
+
+    assert asyncio.run(scenario()) == ("answer 1", "answer 1", "answer 2")
+    assert len(generations) == 2
+
+
+def test_concurrent_identical_prompts_share_one_generation(generations):
+    coalesced = service.LLM_CACHE_REQUESTS.labels("coalesced")
+    before = coalesced._value.get()
+
+    async def scenario():
+        results = await asyncio.gather(*[run_instruction("Summarize", "transcript", temperature=0.0) for _ in range(5)])
+        return results, dict(service._generating)
+
+    results, still_generating = asyncio.run(scenario())
+    assert results == ["answer 1"] * 5
+    assert len(generations) == 1
+    # Every caller after the first waited on the generation in `_generating`, not on the cache
+    assert coalesced._value.get() - before == 4
+    assert still_generating == {}
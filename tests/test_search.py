@@ -0,0 +1,56 @@
+from src.routes.search import SNIPPET_CHARS, _highlight_pattern, _query_terms, build_snippet
+
+
+def snippet_for(text, query):
+    return build_snippet(text, _highlight_pattern(_query_terms(query)))
+
+
+def marked(result):
+    return [result["snippet"][s:e] for s, e in result["highlights"]]
+
+
+def test_query_terms_keep_quoted_phrases_and_drop_exclusions():
+    assert _query_terms('"Price List" discount -trial -"free plan"') == ["price", "list", "discount"]
+
+
+def test_stopword_only_query_highlights_nothing():
+    assert _query_terms("the and of") == []
+    assert _highlight_pattern([]) is None
+    result = snippet_for("the plan and the price", "the and")
+    assert result == {"snippet": "the plan and the price", "snippetOffset": 0, "highlights": []}
+
+
+def test_stopwords_in_a_query_are_not_highlighted():
+    assert marked(snippet_for("Then the pricing came up", "the pricing")) == ["pricing"]
+
+
+def test_every_term_is_highlighted_case_insensitively():
+    result = snippet_for("Pricing first, then the DISCOUNT, then pricing again.", '"discount pricing"')
+    assert marked(result) == ["Pricing", "DISCOUNT", "pricing"]
+
+
+def test_stems_match_other_forms_but_only_at_word_starts():
+    assert marked(snippet_for("We priced it at the price point, not a reprice", "pricing")) == ["priced", "price"]
+
+
+def test_snippet_is_a_window_around_the_first_match():
+    text = "x" * 300 + " budget " + "y" * 300
+    result = snippet_for(text, "budget")
+    match = text.index("budget")
+
+    assert result["snippetOffset"] == match - SNIPPET_CHARS // 3
+    assert len(result["snippet"]) == SNIPPET_CHARS
+    assert marked(result) == ["budget"]
+    assert result["highlights"][0][0] == match - result["snippetOffset"]
+
+
+def test_matches_outside_the_window_are_not_reported():
+    text = "budget " + "x" * 400 + " budget"
+    result = snippet_for(text, "budget")
+    assert result["snippetOffset"] == 0
+    assert result["highlights"] == [[0, 6]]
+
+
+def test_short_text_and_no_match_start_at_the_beginning():
+    result = snippet_for("nothing relevant here", "budget")
+    assert result == {"snippet": "nothing relevant here", "snippetOffset": 0, "highlights": []}
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from src.services import session_context
+from src.services.session_context import get_session_context, invalidate_session_context
+
+
+@pytest.fixture(autouse=True)
+def empty_context_cache():
+    session_context._contexts.clear()
+
+
+def test_context_is_the_owners_and_refused_to_other_users(db):
+    async def scenario():
+        meeting = await db["meetings"].insert_one({"userId": "owner", "topics": ["pricing"]})
+        sessionId = str(meeting.inserted_id)
+        await db["salesSamples"].insert_many([
+            {"userId": "owner", "s3_url": "https://s3/owner.wav"},
+            {"userId": "other", "s3_url": "https://s3/other.wav"},
+        ])
+        with pytest.raises(PermissionError):
+            await get_session_context(sessionId, "other")
+        context = await get_session_context(sessionId, "owner")
+        assert context.salesperson_sample["s3_url"] == "https://s3/owner.wav"
+        assert await get_session_context(sessionId, "owner") is context
+
+        invalidate_session_context(sessionId)
+        assert await get_session_context(sessionId, "owner") is not context
+
+    asyncio.run(scenario())
+
+
+def test_sessions_without_a_meeting_are_cached_per_user(db):
+    async def scenario():
+        first = await get_session_context("adhoc", "u1")
+        second = await get_session_context("adhoc", "u2")
+        assert (first.userId, second.userId) == ("u1", "u2")
+
+    asyncio.run(scenario())
+
+
+def test_meeting_edited_elsewhere_reloads_the_context(db):
+    from src.services import mongo_service
+
+    async def scenario():
+        meeting = await db["meetings"].insert_one({"userId": "owner", "description": "intro", "updatedAt": 1})
+        sessionId = str(meeting.inserted_id)
+        context = await get_session_context(sessionId, "owner")
+        assert await get_session_context(sessionId, "owner") is context
+
+        # Another worker's update doesn't call this process's invalidate_session_context
+        await mongo_service.update_meeting(sessionId, "owner", {"description": "demo"})
+        reloaded = await get_session_context(sessionId, "owner")
+        assert reloaded is not context and reloaded.description == "demo"
+        assert await get_session_context(sessionId, "owner") is reloaded
+
+    asyncio.run(scenario())
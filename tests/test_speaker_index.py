@@ -0,0 +1,82 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.services import mongo_service, speaker_index
+from src.services.speaker_index import SpeakerIndex, embedding_to_bytes, load_speaker_index
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def unit(*components, dim=4):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[:len(components)] = components
+    return vector
+
+
+@pytest.fixture(autouse=True)
+def empty_index_cache():
+    speaker_index._indexes.clear()
+
+
+def test_search_ranks_voices_by_cosine_similarity():
+    index = SpeakerIndex(dim=4)
+    index.add("v1", "Ana", unit(1, 0))
+    index.add("v2", "Ben", unit(0, 1))
+    index.add("v3", "Cy", unit(1, 1))
+
+    # Scale doesn't matter, only direction
+    results = index.search(unit(10, 1), k=2)
+    assert [label for label, _ in results] == ["Ana", "Cy"]
+    assert results[0][1] == pytest.approx(10 / np.sqrt(101))
+    assert index.search(unit(0, 1), k=10)[0] == ("Ben", pytest.approx(1.0))
+    assert len(index.search(unit(0, 1), k=10)) == 3
+
+
+def test_match_applies_the_threshold():
+    index = SpeakerIndex(dim=4)
+    index.add("v1", "Ana", unit(1, 0))
+    assert index.match(unit(1, 0.1), threshold=0.9) == "Ana"
+    assert index.match(unit(1, 1), threshold=0.9) is None
+    assert SpeakerIndex(dim=4).match(unit(1, 0)) is None
+
+
+def test_add_grows_past_the_initial_capacity():
+    index = SpeakerIndex(dim=4)
+    for i in range(100):
+        index.add(f"v{i}", f"Voice {i}", unit(1, i))
+    assert len(index) == 100
+    assert index.search(unit(1, 99))[0][0] == "Voice 99"
+
+
+def test_adding_a_voice_again_replaces_its_row():
+    index = SpeakerIndex(dim=4)
+    index.add("v1", "Speaker 1", unit(1, 0))
+    index.add("v1", "Ana", unit(1, 0))
+    assert len(index) == 1
+    assert index.labels == ["Ana"]
+
+
+def test_index_reloads_when_a_voice_is_named_elsewhere(db):
+    async def scenario():
+        ids = await mongo_service.save_session_voices("u1", "s1", [
+            {"label": "Speaker 1", "name": "Ana", "embedding": embedding_to_bytes(unit(1, 0, dim=192))},
+            {"label": "Speaker 2", "embedding": embedding_to_bytes(unit(0, 1, dim=192))},
+        ])
+        first = await load_speaker_index("u1")
+        assert await load_speaker_index("u1") is first
+
+        # Another worker names Speaker 2; this one's cached index is now behind Mongo
+        await asyncio.sleep(0.01)
+        await mongo_service.name_session_voice("u1", "s1", "Speaker 2", "Ben")
+        second = await load_speaker_index("u1")
+        return ids, first, second
+
+    ids, first, second = run(scenario())
+    assert first.labels == ["Ana"]
+    assert second is not first
+    assert sorted(second.labels) == ["Ana", "Ben"]
+    assert len(ids) == 2
@@ -0,0 +1,110 @@
+import asyncio
+
+from src.services import mongo_service
+from src.services.task_supervisor import TaskSupervisor
+
+
+class Checkpoints:
+    def __init__(self, tasks):
+        self.tasks = list(tasks)
+
+    async def claim_pending_task(self, names):
+        for task in self.tasks:
+            if task["name"] in names:
+                self.tasks.remove(task)
+                return task
+        return None
+
+    async def save_pending_tasks(self, tasks):
+        self.tasks.extend(tasks)
+
+
+def test_replay_leaves_what_does_not_fit_checkpointed(monkeypatch):
+    checkpoints = Checkpoints([{"name": "summary", "args": [f"s{i}"], "key": None} for i in range(5)])
+    monkeypatch.setattr(mongo_service, "claim_pending_task", checkpoints.claim_pending_task)
+    monkeypatch.setattr(mongo_service, "save_pending_tasks", checkpoints.save_pending_tasks)
+
+    async def scenario():
+        release = asyncio.Event()
+        handled = []
+
+        async def handler(sessionId):
+            await release.wait()
+            handled.append(sessionId)
+
+        supervisor = TaskSupervisor()
+        supervisor.register("summary", handler, concurrency=1, max_queue=2)
+        await supervisor.start()
+        # One task running, two queued; the other two must still be checkpointed
+        left = [task["args"] for task in checkpoints.tasks]
+        release.set()
+        await supervisor.wait_idle(1)
+        await supervisor.shutdown(1)
+        return left, handled
+
+    left, handled = asyncio.run(scenario())
+    assert len(left) + len(handled) == 5
+    assert left and handled
+
+
+def test_replay_puts_back_a_checkpoint_it_could_not_queue(monkeypatch):
+    checkpoints = Checkpoints([{"name": "summary", "args": ["s1"], "key": None}])
+    monkeypatch.setattr(mongo_service, "claim_pending_task", checkpoints.claim_pending_task)
+    monkeypatch.setattr(mongo_service, "save_pending_tasks", checkpoints.save_pending_tasks)
+
+    async def scenario():
+        async def handler(sessionId):
+            pass
+
+        supervisor = TaskSupervisor()
+        supervisor.register("summary", handler, concurrency=1, max_queue=1)
+        # The queue fills up between the capacity check and the claim
+        original_claim = checkpoints.claim_pending_task
+
+        async def claim_then_fill(names):
+            task = await original_claim(names)
+            supervisor.submit("summary", "s0")
+            return task
+
+        monkeypatch.setattr(mongo_service, "claim_pending_task", claim_then_fill)
+        await supervisor._replay()
+
+    asyncio.run(scenario())
+    assert checkpoints.tasks == [{"name": "summary", "args": ["s1"], "key": None}]
+
+
+def test_full_queue_spills_to_the_checkpoint_and_runs_it_later(monkeypatch):
+    checkpoints = Checkpoints([])
+    monkeypatch.setattr(mongo_service, "claim_pending_task", checkpoints.claim_pending_task)
+    monkeypatch.setattr(mongo_service, "save_pending_tasks", checkpoints.save_pending_tasks)
+
+    async def scenario():
+        release = asyncio.Event()
+        handled = []
+
+        async def handler(sessionId):
+            await release.wait()
+            handled.append(sessionId)
+
+        supervisor = TaskSupervisor()
+        supervisor.register("summary", handler, concurrency=1, max_queue=1)
+        await supervisor.start()
+        accepted = [supervisor.submit("summary", "s0")]
+        await asyncio.sleep(0)  # s0 is running, the queue is empty again
+        accepted += [supervisor.submit("summary", f"s{i}") for i in range(1, 4)]
+        await asyncio.sleep(0.01)
+        spilled = [task["args"] for task in checkpoints.tasks]
+
+        release.set()
+        for _ in range(100):
+            if len(handled) == 4:
+                break
+            await asyncio.sleep(0.01)
+        await supervisor.shutdown(1)
+        return accepted, spilled, handled
+
+    accepted, spilled, handled = asyncio.run(scenario())
+    assert accepted == [True, True, False, False]
+    assert spilled == [["s2"], ["s3"]]
+    assert handled == ["s0", "s1", "s2", "s3"]
+    assert checkpoints.tasks == []
@@ -0,0 +1,61 @@
+from src.services.topic_matcher import SessionTopics, TopicMatcher, normalize
+
+
+def session(topics, synonyms=None, covered=None):
+    return SessionTopics(topics, TopicMatcher.for_meeting(topics, synonyms), covered)
+
+
+def topics_of(events):
+    return [event["topic"] for event in events]
+
+
+def test_normalize_lowercases_and_drops_punctuation():
+    assert normalize("  Pricing,  PLAN!\nNext-steps? ") == " pricing plan next steps "
+    assert normalize("") == "  "
+
+
+def test_topics_match_whole_words_only():
+    tracker = session(["pricing", "plan"])
+    assert tracker.feed("We are repricing the planner, see airplane.") == []
+    assert topics_of(tracker.feed("The plan changed.")) == ["plan"]
+
+
+def test_case_and_punctuation_do_not_matter():
+    tracker = session(["Next Steps", "ROI"])
+    assert topics_of(tracker.feed("next-steps: agree on the roi.")) == ["Next Steps", "ROI"]
+
+
+def test_synonyms_count_for_their_topic():
+    tracker = session(["pricing"], {"pricing": ["cost", "how much"]})
+    events = tracker.feed("So, how much is it?", seq=3)
+    assert events == [{"topic": "pricing", "phrase": "how much", "seq": 3}]
+    assert tracker.feed("And the cost?") == []
+
+
+def test_phrase_split_across_chunks_matches():
+    tracker = session(["security review", "contract"])
+    assert tracker.feed("We still need the security", seq=0) == []
+    assert tracker.feed("Review before signing", seq=1) == [
+        {"topic": "security review", "phrase": "security review", "seq": 1}
+    ]
+
+
+def test_chunk_boundary_does_not_join_words():
+    tracker = session(["pricing"])
+    tracker.feed("we talked about pri")
+    assert tracker.feed("cing") == []
+
+
+def test_topic_is_reported_once_and_summarised_in_order():
+    tracker = session(["budget", "timeline", "pricing"], covered={"pricing": {"topic": "pricing", "phrase": "pricing", "seq": 0}})
+    assert topics_of(tracker.feed("Budget first, then budget again.", seq=2)) == ["budget"]
+    assert tracker.feed("pricing and budget") == []
+    assert tracker.not_covered() == ["timeline"]
+    assert [event["topic"] for event in tracker.summary()["covered"]] == ["budget", "pricing"]
+
+
+def test_many_topics_are_found_in_one_pass():
+    topics = [f"topic {i}" for i in range(50)]
+    matcher = TopicMatcher.for_meeting(topics)
+    found = {topic for topic, _ in matcher.scan(normalize("topic 7, topic 42 and topic 4"))}
+    assert found == {"topic 7", "topic 42", "topic 4"}
@@ -0,0 +1,123 @@
+import asyncio
+from collections import namedtuple
+import numpy as np
+import pytest
+
+from src.services import transcription_service
+from src.services.transcription_batcher import TranscriptionBatcher
+from src.services.transcription_service import SAMPLE_RATE, WINDOW_SAMPLES, assign_segments, transcribe_audio_batch
+
+Segment = namedtuple("Segment", "start end text")
+
+
+class PackingPipeline:
+    """Decodes like faster-whisper's collect_chunks: consecutive clips are packed into
+    windows of up to 30s, and each window comes back as one segment spanning it."""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, clip_timestamps, batch_size, language, **kwargs):
+        self.calls.append({"clips": clip_timestamps, "batch_size": batch_size, "language": language})
+        windows = []
+        for clip in clip_timestamps:
+            if windows and clip["end"] - windows[-1]["start"] <= 30:
+                windows[-1]["end"] = clip["end"]
+            else:
+                windows.append(dict(clip))
+        segments = []
+        for window in windows:
+            samples = audio[int(window["start"] * SAMPLE_RATE):int(window["end"] * SAMPLE_RATE)]
+            # Each chunk in these tests is a constant "voice" value; the text names every voice heard
+            voices = [str(int(v)) for v in dict.fromkeys(samples) if v]
+            segments.append(Segment(window["start"], window["end"], " ".join(f"user{v}" for v in voices)))
+        return iter(segments), None
+
+
+class FakeEngine:
+    def __init__(self):
+        self.batched = PackingPipeline()
+        self.decode_options = {}
+        self.detections = []
+
+    def detect_languages(self, audios):
+        self.detections.append(len(audios))
+        return ["de" if audio[0] == 9 else "en" for audio in audios]
+
+    def record(self, audio_seconds, processing_seconds):
+        pass
+
+
+@pytest.fixture
+def chunks(monkeypatch):
+    # Audio "bytes" are the voice value and length in seconds, decoded to a constant signal
+    def decode_audio(stream, sampling_rate):
+        if stream.getvalue() == b"garbage":
+            raise ValueError("Invalid data found when processing input")
+        voice, seconds = stream.getvalue().decode().split(":")
+        return np.full(int(float(seconds) * sampling_rate), float(voice), dtype=np.float32)
+
+    monkeypatch.setattr(transcription_service, "decode_audio", decode_audio)
+    monkeypatch.setattr(transcription_service, "BATCH_LANGUAGE", None)
+
+
+def test_short_chunks_of_different_users_never_share_a_window(chunks):
+    engine = FakeEngine()
+    texts = transcribe_audio_batch(engine, [b"1:4", b"2:5", b"3:3"])
+    assert texts == ["user1", "user2", "user3"]
+    for clip in engine.batched.calls[0]["clips"]:
+        assert clip["end"] - clip["start"] == WINDOW_SAMPLES / SAMPLE_RATE
+
+
+def test_long_chunk_is_split_into_windows_of_its_own(chunks):
+    engine = FakeEngine()
+    texts = transcribe_audio_batch(engine, [b"1:45", b"2:2"])
+    assert texts == ["user1 user1", "user2"]
+    assert len(engine.batched.calls[0]["clips"]) == 3
+
+
+def test_language_is_detected_per_chunk_unless_pinned(chunks, monkeypatch):
+    engine = FakeEngine()
+    assert transcribe_audio_batch(engine, [b"1:2", b"9:2", b"2:2"]) == ["user1", "user9", "user2"]
+    assert [call["language"] for call in engine.batched.calls] == ["en", "de"]
+    # Detected for the whole batch at once
+    assert engine.detections == [3]
+
+    monkeypatch.setattr(transcription_service, "BATCH_LANGUAGE", "en")
+    engine = FakeEngine()
+    transcribe_audio_batch(engine, [b"1:2", b"9:2"])
+    assert [call["language"] for call in engine.batched.calls] == ["en"]
+    assert engine.detections == []
+
+
+def test_undecodable_chunk_fails_alone(chunks):
+    texts = transcribe_audio_batch(FakeEngine(), [b"1:2", b"garbage", b"2:2"])
+    assert texts[0] == "user1" and texts[2] == "user2"
+    assert isinstance(texts[1], ValueError)
+
+
+def test_batcher_fails_only_the_request_whose_chunk_failed():
+    def transcribe_batch(chunks):
+        return [ValueError("bad audio") if chunk == b"bad" else chunk.decode() for chunk in chunks]
+
+    async def scenario():
+        batcher = TranscriptionBatcher(transcribe_batch, max_batch_size=8, max_wait_ms=20)
+        return await asyncio.gather(*(batcher.transcribe(chunk) for chunk in (b"a", b"bad", b"c")),
+                                    return_exceptions=True)
+
+    good, bad, other = asyncio.run(scenario())
+    assert (good, other) == ("a", "c")
+    assert isinstance(bad, ValueError)
+
+
+def test_batch_size_is_capped(chunks, monkeypatch):
+    monkeypatch.setattr(transcription_service, "BATCH_INFERENCE_SIZE", 2)
+    engine = FakeEngine()
+    transcribe_audio_batch(engine, [b"1:1", b"2:1", b"3:1"])
+    assert engine.batched.calls[0]["batch_size"] == 2
+
+
+def test_segment_spanning_two_chunks_goes_to_the_one_it_overlaps_most():
+    bounds = [(0.0, 4.0), (4.0, 9.0)]
+    segments = [Segment(3.5, 8.0, "mostly second"), Segment(0.0, 3.0, "first"), Segment(6.0, 6.0, "point")]
+    assert assign_segments(segments, bounds) == [["first"], ["mostly second", "point"]]
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+import time
+
+from src import utils
+from src.utils import TTLCache
+
+
+def test_ttl_cache_evicts_expired_entries_on_read():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("short", 1, expires_at=time.time() - 1)
+    cache.set("long", 2)
+    assert cache.get("short") is None
+    assert len(cache) == 1
+    assert cache.get("long") == 2
+
+
+def test_ttl_cache_expires_at_never_extends_the_ttl():
+    cache = TTLCache(maxsize=10, ttl=0)
+    cache.set("key", 1, expires_at=time.time() + 3600)
+    assert cache.get("key") is None
+
+
+def test_ttl_cache_drops_the_least_recently_used_past_maxsize():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.keys() == ["a", "c"]
+
+
+def test_bcrypt_runs_on_the_bounded_executor(monkeypatch):
+    threads = []
+    monkeypatch.setattr(utils, "hash_password", lambda password: threads.append(threading.current_thread().name) or "hash")
+    monkeypatch.setattr(utils, "verify_password", lambda password, hashed: threads.append(threading.current_thread().name) or True)
+
+    async def scenario():
+        return await asyncio.gather(*[utils.hash_password_async("pw") for _ in range(5)], utils.verify_password_async("pw", "hash"))
+
+    assert asyncio.run(scenario()) == ["hash"] * 5 + [True]
+    assert all(name.startswith("bcrypt") for name in threads)
+    assert len(set(threads)) <= utils._bcrypt_executor._max_workers